@@ -175,6 +175,12 @@ class EventAdmin(ManyToManyMixin, admin.ModelAdmin):
     def get_categories(self, obj):
         return self.links_to_objects(obj.categories.all())
 
+    def save_model(self, request, obj, form, change):
+        if change:
+            # счётчики могли измениться после загрузки события
+            obj.refresh_from_db(fields=Event.PARTICIPANTS_COUNTERS)
+        super().save_model(request, obj, form, change)
+
     @admin.action(description="Заблокировать выбранные события")
     def block_events(self, request, queryset):
         queryset.update(is_active=False)
@@ -7,3 +7,7 @@ class ApiConfig(AppConfig):
 
     def ready(self):
         import apps.api.signals
+        from apps.api.cache import CACHE_INVALIDATION_RULES
+        from core.cache import register_invalidation_rules
+
+        register_invalidation_rules(CACHE_INVALIDATION_RULES)
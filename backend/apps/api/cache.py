@@ -0,0 +1,25 @@
+from apps.api.models import (
+    Category,
+    City,
+    Country,
+    Docs,
+    Event,
+    EventAdminProxy,
+    EventFastFilter,
+    EventParticipant,
+    Occupation,
+    Theme,
+)
+from core.cache import InvalidationRule
+
+# пространства имён кэша и модели, изменение которых их сбрасывает
+CACHE_INVALIDATION_RULES = [
+    InvalidationRule("countries", (Country,)),
+    InvalidationRule("cities", (City, Country)),
+    InvalidationRule("themes", (Theme, Category)),
+    InvalidationRule("categories", (Category,)),
+    InvalidationRule("occupations", (Occupation,)),
+    InvalidationRule("docs", (Docs,)),
+    InvalidationRule("catalog", (EventFastFilter, Theme, Category)),
+    InvalidationRule("event_feed", (Event, EventAdminProxy, EventParticipant)),
+]
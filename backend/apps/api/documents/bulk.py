@@ -0,0 +1,115 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from django.db import close_old_connections
+from django.db.models import Max, Min
+from django_elasticsearch_dsl import Document
+from elasticsearch.helpers import bulk
+
+
+@dataclass
+class BulkIndexReport:
+    document: str
+    total: int = 0
+    indexed: int = 0
+    errors: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        return self.indexed / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.document}: {self.indexed}/{self.total} документов, "
+            f"ошибок: {self.errors}, {self.elapsed:.1f} с, "
+            f"{self.throughput:.0f} док/с"
+        )
+
+
+def iter_id_ranges(queryset, step: int) -> Iterator[tuple[int, int]]:
+    """Диапазоны первичных ключей [start, end) для разбиения по воркерам."""
+    bounds = queryset.aggregate(min_id=Min("pk"), max_id=Max("pk"))
+    if bounds["min_id"] is None:
+        return
+    for start in range(bounds["min_id"], bounds["max_id"] + 1, step):
+        yield start, start + step
+
+
+def index_id_range(
+    document_class: type[Document],
+    start: int,
+    end: int,
+    index_name: str | None = None,
+    chunk_size: int = 500,
+) -> tuple[int, int]:
+    """
+    Индексация объектов с pk в [start, end): объекты читаются из БД
+    и отправляются в bulk API порциями по chunk_size.
+    """
+    try:
+        document = document_class()
+        objects = (
+            document.get_queryset()
+            .filter(pk__gte=start, pk__lt=end)
+            .order_by("pk")
+            .iterator(chunk_size=chunk_size)
+        )
+        actions = document.get_actions(objects, action="index")
+        if index_name is not None:
+            actions = ({**action, "_index": index_name} for action in actions)
+        success, errors = bulk(
+            client=document._get_connection(),
+            actions=actions,
+            chunk_size=chunk_size,
+            raise_on_error=False,
+        )
+        return success, len(errors)
+    finally:
+        close_old_connections()
+
+
+def bulk_index(
+    document_class: type[Document],
+    index_name: str | None = None,
+    workers: int = 4,
+    chunk_size: int = 500,
+    ids_per_task: int = 5000,
+    progress: Callable[[BulkIndexReport], None] | None = None,
+) -> BulkIndexReport:
+    """
+    Полная переиндексация документа: диапазоны по ids_per_task id
+    обрабатываются параллельно, каждый воркер отправляет данные
+    через bulk API запросами по chunk_size документов.
+    """
+    document = document_class()
+    queryset = document.get_queryset()
+    report = BulkIndexReport(
+        document=document_class.__name__, total=queryset.order_by().count()
+    )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                index_id_range, document_class, start, end, index_name, chunk_size
+            )
+            for start, end in iter_id_ranges(queryset, ids_per_task)
+        ]
+        for future in as_completed(futures):
+            success, errors = future.result()
+            report.indexed += success
+            report.errors += errors
+            if progress is not None:
+                progress(report)
+
+    index = document_class._index
+    if index_name is not None:
+        index = index.clone(name=index_name)
+    index.refresh()
+    return report
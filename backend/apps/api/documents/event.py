@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from django_elasticsearch_dsl import Document
 from django_elasticsearch_dsl.registries import registry
 from django_elasticsearch_dsl.fields import (
@@ -127,12 +128,27 @@ class EventDocument(Document):
             Location,
             User,
         ]
+        queryset_pagination = 500
 
     settings = {
         "number_of_shards": 1,
         "number_of_replicas": 0,
     }
 
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .select_related("location__city", "country", "city", "theme")
+            .prefetch_related(
+                "categories",
+                Prefetch(
+                    "participants",
+                    queryset=EventParticipant.objects.select_related("user"),
+                ),
+            )
+        )
+
     def get_instances_from_related(self, related_instance):
         if isinstance(related_instance, Event):
             return related_instance.objects.all()
@@ -145,12 +161,14 @@ class EventDocument(Document):
 
     @staticmethod
     def prepare_participants(instance: Event):
-        participants = instance.participants.all()
-        male = participants.filter(user__gender=Gender.MALE).count()
-        female = participants.filter(user__gender=Gender.FEMALE).count()
-        total = participants.count()
+        # статистика считается по участникам из prefetch в get_queryset
+        users = [p.user for p in instance.participants.all()]
+        genders = [user.gender for user in users]
+        male = genders.count(Gender.MALE)
+        female = genders.count(Gender.FEMALE)
+        total = len(users)
         return {
-            "user": [{"id": p.user.id, "gender": p.user.gender} for p in participants],
+            "user": [{"id": user.id, "gender": user.gender} for user in users],
             "stats": {
                 "men": f"{male}/{instance.total_male}"
                 if instance.total_male is not None
@@ -191,6 +209,8 @@ class EventDocument(Document):
     @staticmethod
     def prepare_location(instance: Event):
         location = instance.location
+        if location is None:
+            return None
         return {
             "name": location.name,
             "address": f"{location.city.name}, {location.address}",
@@ -0,0 +1,119 @@
+from typing import Callable
+
+from django.core.cache import cache
+from django.utils.timezone import localtime
+from django_elasticsearch_dsl import Document
+
+from .bulk import BulkIndexReport, bulk_index
+
+# максимальная длительность перестроения, после которой блокировка снимается
+REBUILD_LOCK_TIMEOUT = 60 * 60
+
+
+class RebuildInProgressError(Exception):
+    """Перестроение индекса уже выполняется."""
+
+
+def lock_key(document_class: type[Document]) -> str:
+    return f"es_rebuild_lock_{document_class.__name__}"
+
+
+def building_index_key(document_class: type[Document]) -> str:
+    return f"es_building_index_{document_class.__name__}"
+
+
+def get_building_index(document_class: type[Document]) -> str | None:
+    """Индекс, который сейчас заполняется и ещё не подключён к алиасу."""
+    return cache.get(building_index_key(document_class))
+
+
+def alias_exists(document_class: type[Document]) -> bool:
+    """
+    Проверка наличия алиаса. Индекс старого формата без алиаса
+    (или созданный автоматически при записи) тоже перестраивается.
+    """
+    connection = document_class._get_connection()
+    return connection.indices.exists_alias(name=document_class._index._name)
+
+
+def request_rebuild(document_class: type[Document]) -> bool:
+    """
+    Запуск фонового перестроения индекса. Блокировка в Redis гарантирует,
+    что одновременно выполняется только одно перестроение.
+    """
+    if not acquire_rebuild_lock(document_class):
+        return False
+
+    from apps.api.tasks import rebuild_search_index
+
+    rebuild_search_index.delay(document_class.__name__)
+    return True
+
+
+def acquire_rebuild_lock(document_class: type[Document]) -> bool:
+    return cache.add(lock_key(document_class), True, timeout=REBUILD_LOCK_TIMEOUT)
+
+
+def release_rebuild_lock(document_class: type[Document]):
+    cache.delete(lock_key(document_class))
+
+
+def rebuild(
+    document_class: type[Document],
+    workers: int = 4,
+    chunk_size: int = 500,
+    ids_per_task: int = 5000,
+    progress: Callable[[BulkIndexReport], None] | None = None,
+    lock_acquired: bool = False,
+) -> BulkIndexReport:
+    """
+    Заполнение нового версионного индекса и атомарное переключение
+    на него алиаса, по имени которого работают поиск и индексация.
+    Блокировка перестроения берётся здесь, если её уже не взял
+    request_rebuild (lock_acquired=True), и снимается по завершении.
+    """
+    if not lock_acquired and not acquire_rebuild_lock(document_class):
+        raise RebuildInProgressError(
+            f"Индекс {document_class._index._name} уже перестраивается"
+        )
+
+    alias = document_class._index._name
+    new_index = f"{alias}-{localtime():%Y%m%d%H%M%S}"
+    try:
+        document_class._index.clone(name=new_index).create()
+        cache.set(building_index_key(document_class), new_index, REBUILD_LOCK_TIMEOUT)
+        try:
+            report = bulk_index(
+                document_class,
+                index_name=new_index,
+                workers=workers,
+                chunk_size=chunk_size,
+                ids_per_task=ids_per_task,
+                progress=progress,
+            )
+            swap_alias(document_class, new_index)
+        finally:
+            cache.delete(building_index_key(document_class))
+    finally:
+        release_rebuild_lock(document_class)
+    return report
+
+
+def swap_alias(document_class: type[Document], new_index: str):
+    connection = document_class._get_connection()
+    alias = document_class._index._name
+
+    old_indices = []
+    if connection.indices.exists_alias(name=alias):
+        old_indices = list(connection.indices.get_alias(name=alias))
+
+    actions = [{"remove": {"index": index, "alias": alias}} for index in old_indices]
+    if not old_indices and connection.indices.exists(index=alias):
+        # индекс старого формата с именем алиаса удаляется в той же операции
+        actions.append({"remove_index": {"index": alias}})
+    actions.append({"add": {"index": new_index, "alias": alias}})
+    connection.indices.update_aliases(body={"actions": actions})
+
+    for index in old_indices:
+        if index != new_index:
+            connection.indices.delete(index=index, ignore=404)
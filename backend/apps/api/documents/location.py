@@ -47,12 +47,16 @@ class LocationDocument(Document):
         related_models = [
             City,
         ]
+        queryset_pagination = 500
 
     settings = {
         "number_of_shards": 1,
         "number_of_replicas": 0,
     }
 
+    def get_queryset(self):
+        return super().get_queryset().select_related("city")
+
     def get_instances_from_related(self, related_instance):
         if isinstance(related_instance, Location):
             return related_instance.objects.all()
@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models, transaction
+from django_elasticsearch_dsl import Document
+from django_elasticsearch_dsl.apps import DEDConfig
+from django_elasticsearch_dsl.registries import registry
+from django_elasticsearch_dsl.signals import RealTimeSignalProcessor
+from elasticsearch.helpers import bulk
+
+from .lifecycle import get_building_index
+
+
+def get_document_class(label: str) -> type[Document]:
+    return {doc.__name__: doc for doc in registry.get_documents()}[label]
+
+
+def pending_key(document_class: type[Document], pk) -> str:
+    return f"es_pending_{document_class.__name__}_{pk}"
+
+
+def enqueue_documents(document_class: type[Document], pks):
+    """
+    Постановка документов в очередь на переиндексацию после коммита.
+    Повторные изменения одного документа в пределах окна
+    ELASTICSEARCH_DSL_QUEUE_WINDOW схлопываются в одну задачу.
+    """
+    pks = set(pks)
+    if not pks:
+        return
+
+    def schedule():
+        from apps.api.tasks import sync_search_documents
+
+        window = settings.ELASTICSEARCH_DSL_QUEUE_WINDOW
+        new_pks = [
+            pk
+            for pk in pks
+            if cache.add(pending_key(document_class, pk), True, timeout=window * 10)
+        ]
+        if new_pks:
+            sync_search_documents.apply_async(
+                args=[document_class.__name__, new_pks], countdown=window
+            )
+
+    transaction.on_commit(schedule)
+
+
+def sync_documents(document_class: type[Document], pks):
+    """Запись актуального состояния документов из БД одним bulk-запросом."""
+    cache.delete_many([pending_key(document_class, pk) for pk in pks])
+
+    document = document_class()
+    objects = list(document.get_queryset().filter(pk__in=pks))
+    found = {obj.pk for obj in objects}
+    document_actions = list(document.get_actions(objects, action="index"))
+    document_actions += [
+        {"_op_type": "delete", "_id": pk} for pk in pks if pk not in found
+    ]
+
+    # во время перестроения изменения пишутся и в новый индекс
+    indices = [document._index._name]
+    if building_index := get_building_index(document_class):
+        indices.append(building_index)
+    actions = [
+        {**action, "_index": index} for index in indices for action in document_actions
+    ]
+    return bulk(
+        client=document._get_connection(), actions=actions, raise_on_error=False
+    )
+
+
+class CoalescingSignalProcessor(RealTimeSignalProcessor):
+    """
+    Обработчик сигналов, который не индексирует документы в запросе,
+    а только ставит их id в очередь Celery.
+    """
+
+    def enqueue_instance(self, instance):
+        if not DEDConfig.autosync_enabled():
+            return
+
+        model = instance._meta.concrete_model
+        for document_class in registry._models.get(model, []):
+            if not document_class.django.ignore_signals:
+                enqueue_documents(document_class, [instance.pk])
+
+    def enqueue_related(self, instance):
+        if not DEDConfig.autosync_enabled():
+            return
+
+        for document_class in registry._get_related_doc(instance):
+            try:
+                related = document_class().get_instances_from_related(instance)
+            except ObjectDoesNotExist:
+                related = None
+
+            if related is None:
+                continue
+            if isinstance(related, models.Model):
+                pks = [related.pk]
+            else:
+                pks = related.values_list("pk", flat=True)
+            enqueue_documents(document_class, pks)
+
+    def handle_save(self, sender, instance, **kwargs):
+        self.enqueue_instance(instance)
+        self.enqueue_related(instance)
+
+    def handle_pre_delete(self, sender, instance, **kwargs):
+        self.enqueue_related(instance)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        self.enqueue_instance(instance)
@@ -3,3 +3,4 @@
 from .eventstatus import EventStatus
 from .gender import Gender
 from .eventstate import EventState
+from .searchbackend import SearchBackend
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class SearchBackend(str, Enum):
+    ELASTICSEARCH = "elasticsearch"
+    DATABASE = "database"
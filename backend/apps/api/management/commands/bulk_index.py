@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.api.documents import EventDocument, LocationDocument
+from apps.api.documents.bulk import BulkIndexReport, bulk_index
+from apps.api.documents.lifecycle import RebuildInProgressError, rebuild
+
+DOCUMENTS = {
+    "event": EventDocument,
+    "location": LocationDocument,
+}
+
+
+class Command(BaseCommand):
+    help = "Параллельная bulk-индексация документов Elasticsearch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--models",
+            nargs="+",
+            choices=DOCUMENTS.keys(),
+            default=list(DOCUMENTS.keys()),
+            help="Индексируемые документы (по умолчанию - все)",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Заполнить новый индекс и переключить на него алиас",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Документов в одном bulk-запросе",
+        )
+        parser.add_argument(
+            "--ids-per-task",
+            type=int,
+            default=5000,
+            help="Размер диапазона id, который обрабатывает один воркер",
+        )
+
+    def handle(self, *args, **options):
+        for name in options["models"]:
+            document_class = DOCUMENTS[name]
+            index = rebuild if options["rebuild"] else bulk_index
+            try:
+                report = index(
+                    document_class,
+                    workers=options["workers"],
+                    chunk_size=options["chunk_size"],
+                    ids_per_task=options["ids_per_task"],
+                    progress=self.write_progress,
+                )
+            except RebuildInProgressError as e:
+                raise CommandError(e)
+            self.stdout.write(self.style.SUCCESS(str(report)))
+
+    def write_progress(self, report: BulkIndexReport):
+        self.stdout.write(str(report))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.api.models import Event
+
+
+class Command(BaseCommand):
+    help = "Пересчёт счётчиков участников событий по таблице EventParticipant"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--events",
+            nargs="+",
+            type=int,
+            help="ID событий для пересчёта (по умолчанию - все события)",
+        )
+
+    def handle(self, *args, **options):
+        events = Event.objects.all()
+        if options["events"]:
+            events = events.filter(pk__in=options["events"])
+
+        fixed = events.reconcile_participants_count()
+        self.stdout.write(
+            self.style.SUCCESS(f"Исправлены счётчики участников у {fixed} событий")
+        )
@@ -0,0 +1,50 @@
+# Generated by Django 5.1 on 2026-10-18 15:31
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def forwards(apps, _):
+    Event = apps.get_model("api", "Event")
+
+    events = Event.objects.annotate(
+        male=Count("participants", filter=Q(participants__user__gender="male")),
+        female=Count("participants", filter=Q(participants__user__gender="female")),
+        total=Count("participants"),
+    ).filter(total__gt=0)
+    for event in events.iterator():
+        Event.objects.filter(pk=event.pk).update(
+            participants_male=event.male,
+            participants_female=event.female,
+            participants_total=event.total,
+        )
+
+
+def backwards(apps, _):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0094_remove_verification_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='participants_female',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Записалось женщин'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='participants_male',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Записалось мужчин'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='participants_total',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Записалось участников'),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
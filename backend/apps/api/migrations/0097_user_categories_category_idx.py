@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 15:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Индекс (category_id, user_id) для автоматической промежуточной таблицы
+    User.categories: поиск получателей EVENT_ADDED по категориям события.
+    Уникальный индекс (user_id, category_id) создан Django.
+    """
+
+    dependencies = [
+        ("api", "0096_event_search_trgm_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS api_user_categories_category_user_idx "
+            "ON api_user_categories (category_id, user_id);",
+            "DROP INDEX IF EXISTS api_user_categories_category_user_idx;",
+        ),
+    ]
@@ -1,7 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import TrigramWordSimilarity
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 from django.db.models import Q, F
+from django.db.models.functions import Greatest, Upper
 from django.db.models.manager import BaseManager
 from django.template.defaultfilters import date as _date
 from django.template.defaultfilters import time as _time
@@ -25,7 +28,7 @@ from .user import User
 
 class EventQuerySet(models.QuerySet):
     def get_free_places(self):
-        participants_count = models.Count("participants")
+        participants_count = F("participants_total")
         return self.annotate(
             free_places=models.Case(
                 models.When(
@@ -39,31 +42,75 @@ class EventQuerySet(models.QuerySet):
 
     def get_free_places_by_gender(self, gender: Gender):
         total_field = "total_" + gender
-        participants_count = models.Count(
-            "participants",
-            filter=Q(participants__user__gender=gender),
-        )
         return self.annotate(
             free_places=models.Case(
                 models.When(
                     total_people__isnull=False,
-                    then=F("total_people") - participants_count,
+                    then=F("total_people") - F("participants_total"),
                 ),
                 models.When(**{total_field: None}, then=None),
-                default=F(total_field) - participants_count,
+                default=F(total_field) - F("participants_" + gender),
             )
         )
 
+    def update_participants_count(self, gender: Gender | None, delta: int):
+        # при дрейфе счётчика уменьшение не уходит ниже нуля
+        counters = {"participants_total": Greatest(F("participants_total") + delta, 0)}
+        if gender in Gender.values:
+            field = "participants_" + gender
+            counters[field] = Greatest(F(field) + delta, 0)
+        return self.update(**counters)
+
+    def move_participants_count(self, old_gender: Gender | None, gender: Gender | None):
+        """Смена пола участника: запись переносится между счётчиками по полу."""
+        counters = {}
+        if old_gender in Gender.values:
+            field = "participants_" + old_gender
+            counters[field] = Greatest(F(field) - 1, 0)
+        if gender in Gender.values:
+            field = "participants_" + gender
+            counters[field] = F(field) + 1
+        if not counters:
+            return 0
+        return self.update(**counters)
+
+    def annotate_actual_participants_count(self):
+        return self.annotate(
+            actual_participants_male=models.Count(
+                "participants", filter=Q(participants__user__gender=Gender.MALE)
+            ),
+            actual_participants_female=models.Count(
+                "participants", filter=Q(participants__user__gender=Gender.FEMALE)
+            ),
+            actual_participants_total=models.Count("participants"),
+        )
+
+    def reconcile_participants_count(self) -> int:
+        drifted = list(
+            self.annotate_actual_participants_count().exclude(
+                participants_male=F("actual_participants_male"),
+                participants_female=F("actual_participants_female"),
+                participants_total=F("actual_participants_total"),
+            )
+        )
+        for event in drifted:
+            for field in Event.PARTICIPANTS_COUNTERS:
+                setattr(event, field, getattr(event, "actual_" + field))
+        self.model.objects.bulk_update(drifted, Event.PARTICIPANTS_COUNTERS)
+        return len(drifted)
+
     def filter_has_free_places(self, gender: Gender | None = None):
         if gender is not None:
             return self.get_free_places_by_gender(gender).filter(free_places__gt=0)
         return self.get_free_places().filter(Q(free_places__gt=0) | Q(free_places=None))
 
-    def filter_past(self, hours=0, days=90):
-        return self.filter(
-            start_datetime__lte=localtime() - timedelta(hours=hours),
-            start_datetime__gte=localtime() - timedelta(days=days),
-        )
+    def filter_past(self, hours=0, days: int | None = 90):
+        queryset = self.filter(start_datetime__lte=localtime() - timedelta(hours=hours))
+        if days is not None:
+            queryset = queryset.filter(
+                start_datetime__gte=localtime() - timedelta(days=days)
+            )
+        return queryset
 
     def filter_not_expired(self, days=90):
         return self.filter(
@@ -71,11 +118,50 @@ class EventQuerySet(models.QuerySet):
         )
 
     def filter_upcoming(self):
-        return self.filter(start_datetime__gt=datetime.now())
+        return self.filter(start_datetime__gt=localtime())
 
     def filter_participant(self, user: User):
         return self.filter(participants__user=user)
 
+    def search(self, query: str):
+        """
+        Поиск по названию и краткому описанию (аналог поиска в EventDocument).
+        icontains использует триграммные индексы по UPPER(title)
+        и UPPER(short_description), выдача ранжируется по сходству слов.
+        """
+        return (
+            self.filter(
+                Q(title__icontains=query) | Q(short_description__icontains=query)
+            )
+            .annotate(
+                search_rank=Greatest(
+                    TrigramWordSimilarity(query, "title"),
+                    TrigramWordSimilarity(query, "short_description"),
+                )
+            )
+            .order_by("-search_rank", "start_datetime")
+        )
+
+    def prefetch_detail(self):
+        return self.select_related(
+            "location__country", "location__city", "theme", "chat"
+        ).prefetch_related(
+            "categories",
+            models.Prefetch(
+                "participants",
+                queryset=EventParticipant.objects.select_related("user"),
+            ),
+        )
+
+    def prefetch_list(self):
+        return self.select_related("location__city").prefetch_related(
+            "categories",
+            models.Prefetch(
+                "participants",
+                queryset=EventParticipant.objects.select_related("user"),
+            ),
+        )
+
     def get_recommended_event(self):
         return (
             self.filter(is_active=True, is_draft=False)
@@ -175,6 +261,23 @@ class Event(models.Model):
         _("Организатор оплатит встречу"), null=True, blank=True
     )
 
+    # счётчики обновляются атомарно сигналами EventParticipant
+    participants_male = models.PositiveIntegerField(
+        _("Записалось мужчин"), default=0, editable=False
+    )
+    participants_female = models.PositiveIntegerField(
+        _("Записалось женщин"), default=0, editable=False
+    )
+    participants_total = models.PositiveIntegerField(
+        _("Записалось участников"), default=0, editable=False
+    )
+
+    PARTICIPANTS_COUNTERS = (
+        "participants_male",
+        "participants_female",
+        "participants_total",
+    )
+
     tracker = FieldTracker()
     objects = EventQuerySet.as_manager()
 
@@ -182,6 +285,16 @@ class Event(models.Model):
         verbose_name = "Событие"
         verbose_name_plural = "События"
         ordering = ["date"]
+        indexes = [
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="event_title_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("short_description"), name="gin_trgm_ops"),
+                name="event_short_description_trgm",
+            ),
+        ]
 
     def __str__(self) -> str:
         return str(self.title)
@@ -206,7 +319,7 @@ class Event(models.Model):
 
     @property
     def stats_people(self):
-        count = EventParticipant.objects.filter(event=self).count()
+        count = self.participants_total
         total = self.max_people
         return f"{count}/{total}" if total is not None else str(count)
 
@@ -247,6 +360,11 @@ class Event(models.Model):
 
     @property
     def organizer(self):
+        participants = self.get_prefetched_participants()
+        if participants is not None:
+            organizer = next((p for p in participants if p.is_organizer), None)
+            return getattr(organizer, "user", None)
+
         try:
             return self.participants.get(is_organizer=True).user
         except EventParticipant.DoesNotExist:
@@ -263,9 +381,8 @@ class Event(models.Model):
 
     def get_stats(self, gender: Gender):
         total_field = "total_" + gender
-        participants = EventParticipant.objects.filter(event=self, user__gender=gender)
         total = getattr(self, total_field)
-        count = participants.count()
+        count = self.get_participants_count(gender)
         return f"{count}/{total}" if total is not None else str(count)
 
     def get_participants(self) -> BaseManager[EventParticipant]:
@@ -276,7 +393,22 @@ class Event(models.Model):
     ) -> BaseManager[EventParticipant]:
         return self.participants.filter(user__gender=gender)
 
+    def get_participants_count(self, gender: Gender | None = None) -> int:
+        if gender is None:
+            return self.participants_total
+        return getattr(self, "participants_" + gender)
+
+    def get_prefetched_participants(self) -> list[EventParticipant] | None:
+        """Участники из prefetch_related("participants"), если они загружены."""
+        if "participants" in getattr(self, "_prefetched_objects_cache", {}):
+            return list(self.participants.all())
+        return None
+
     def get_participant(self, user: User) -> EventParticipant | None:
+        participants = self.get_prefetched_participants()
+        if participants is not None:
+            return next((p for p in participants if p.user_id == user.pk), None)
+
         try:
             return self.participants.get(user=user)
         except EventParticipant.DoesNotExist:
@@ -284,7 +416,7 @@ class Event(models.Model):
 
     def get_free_places(self, gender: Gender | None = None) -> bool:
         if self.total_people is not None:
-            return self.total_people - self.participants.count()
+            return self.total_people - self.participants_total
 
         if gender:
             total_field = "total_" + gender
@@ -292,11 +424,11 @@ class Event(models.Model):
             if total_field_value is None:
                 return
 
-            return total_field_value - self.get_participants_by_gender(gender).count()
+            return total_field_value - self.get_participants_count(gender)
         if self.total_male is None or self.total_female is None:
             return
 
-        return self.total_male + self.total_female - self.get_participants().count()
+        return self.total_male + self.total_female - self.participants_total
 
     def is_valid_sign_and_edit_time(self) -> bool:
         start = self.start_datetime
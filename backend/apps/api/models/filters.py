@@ -17,25 +17,71 @@ class FilterGroup(str, Enum):
     CITY = "city"
 
 
+FILTER_GROUPS = {
+    FilterName.TODAY: FilterGroup.DATE,
+    FilterName.TOMORROW: FilterGroup.DATE,
+    FilterName.MY_CITY: FilterGroup.CITY,
+}
+
+
+def get_search_filter_queries(date, city_id):
+    return {
+        FilterName.TODAY: Q("term", **{"date": date}),
+        FilterName.TOMORROW: Q("term", **{"date": date + timedelta(days=1)}),
+        FilterName.MY_CITY: (
+            Q("term", **{"city.id": city_id}) if city_id is not None else Q()
+        ),
+    }
+
+
+def get_db_filter_queries(date, city_id):
+    return {
+        FilterName.TODAY: models.Q(date=date),
+        FilterName.TOMORROW: models.Q(date=date + timedelta(days=1)),
+        FilterName.MY_CITY: (
+            models.Q(city_id=city_id) if city_id is not None else models.Q()
+        ),
+    }
+
+
+def combine_filter_queries(names, filter_queries, empty_query):
+    """Фильтры одной группы объединяются по ИЛИ, группы - по И."""
+    group_queries = []
+    for group in FilterGroup:
+        queries = [
+            filter_queries[name] for name in names if FILTER_GROUPS[name] == group
+        ]
+        if queries:
+            group_queries.append(reduce(ior, queries))
+    return reduce(iand, group_queries, empty_query)
+
+
+def get_user_city_id(user):
+    return getattr(getattr(user, "city", None), "id", None)
+
+
 class EventFastFilterQuerySet(models.QuerySet):
+    def get_active_names(self, filter_ids):
+        return self.filter(id__in=filter_ids, is_active=True).values_list(
+            "name", flat=True
+        )
+
     def get_filter_query(self, filter_ids, user):
-        filter_queries = {
-            FilterName.TODAY: Q("term", **{"date": localtime().date()}),
-            FilterName.TOMORROW: Q(
-                "term", **{"date": localtime().date() + timedelta(days=1)}
-            ),
-            FilterName.MY_CITY: Q("term", **{"city.id": user.city.id})
-            if hasattr(getattr(user, "city", None), "id")
-            else Q(),
-        }
-        filters = self.filter(id__in=filter_ids, is_active=True)
-        group_queries = []
-        for group in FilterGroup:
-            group_filters = [f for f in filters if f.group == group]
-            queries = [filter_queries[f.name] for f in group_filters]
-            if queries:
-                group_queries.append(reduce(ior, queries))
-        return reduce(iand, group_queries)
+        filter_queries = get_search_filter_queries(
+            localtime().date(), get_user_city_id(user)
+        )
+        return combine_filter_queries(
+            self.get_active_names(filter_ids), filter_queries, Q()
+        )
+
+    def get_db_filter_query(self, filter_ids, user):
+        """Те же условия, что и get_filter_query, для запроса к БД."""
+        filter_queries = get_db_filter_queries(
+            localtime().date(), get_user_city_id(user)
+        )
+        return combine_filter_queries(
+            self.get_active_names(filter_ids), filter_queries, models.Q()
+        )
 
 
 class EventFastFilter(models.Model):
@@ -50,12 +96,7 @@ class EventFastFilter(models.Model):
 
     @property
     def group(self):
-        groups = {
-            FilterName.TODAY: FilterGroup.DATE,
-            FilterName.TOMORROW: FilterGroup.DATE,
-            FilterName.MY_CITY: FilterGroup.CITY,
-        }
-        return groups[self.name].value
+        return FILTER_GROUPS[self.name].value
 
     objects = EventFastFilterQuerySet.as_manager()
 
@@ -11,6 +11,7 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils.timezone import localtime
 from dateutil.relativedelta import relativedelta
+from model_utils import FieldTracker
 from phonenumber_field.modelfields import PhoneNumberField
 
 from apps.api.enums import Gender
@@ -163,6 +164,8 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = "phone_number"
 
+    # смена пола переносит участие между счётчиками событий
+    tracker = FieldTracker(fields=["gender"])
     objects = UserManager()
     all_objects = AllUserManager()
 
@@ -5,12 +5,14 @@ from .theme import ThemeCategoriesSerializer, ThemeSerializer
 from .location import (
     LocationSerializer,
     LocationDocumentSerializer,
+    LocationListSerializer,
     LocationCreateSerializer,
     CitySerializer,
     CountrySerializer,
 )
 from .event import (
     EventDocumentSerializer,
+    EventListSerializer,
     EventDetailSerializer,
     EventCreateUpdateSerializer,
     FilterQuerySerializer,
@@ -1,5 +1,4 @@
 from django.core.files.uploadedfile import InMemoryUploadedFile
-from django.db.models import Q
 from django.utils.timezone import localtime, datetime, timedelta
 from django_elasticsearch_dsl_drf.serializers import DocumentSerializer
 from rest_framework import serializers
@@ -24,9 +23,10 @@ from apps.api.serializers import (
     LocationSerializer,
     CategorySerializer,
     ThemeSerializer,
-    ThemeCategoriesSerializer,
 )
+from apps.api.services import catalog
 from apps.api.services.payment import do_payment_on_create
+from apps.chat.counters import get_unread_count
 from apps.coins.exceptions import NoCoinsError
 from apps.notifications.models import GroupNotification
 from core.serializers import CustomFileField
@@ -203,7 +203,7 @@ class EventDetailSerializer(EventMixin, ModelSerializer):
     def get_unread_messages(self, obj: Event):
         user = self.context["user"]
         if user.is_authenticated:
-            return obj.chat.messages.filter(~Q(read__user=user)).count()
+            return get_unread_count(user, obj.pk)
         return 0
 
 
@@ -245,6 +245,49 @@ class EventDocumentFullImageSerializer(EventDocumentSerializer):
         return request.build_absolute_uri(obj.cover) if obj.cover else None
 
 
+class EventListSerializer(EventMixin, ModelSerializer):
+    """Карточка события в ленте, собираемая из БД при недоступном индексе."""
+
+    am_i_organizer = serializers.SerializerMethodField()
+    location = serializers.SerializerMethodField()
+    cover = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Event
+        fields = [
+            "id",
+            "title",
+            "max_age",
+            "min_age",
+            "cover",
+            "short_description",
+            "location",
+            "stats_men",
+            "stats_women",
+            "stats_people",
+            "date_and_time",
+            "am_i_organizer",
+            "sign_price",
+        ]
+
+    def get_location(self, obj: Event):
+        return EventDocument.prepare_location(obj)
+
+    def get_cover(self, obj: Event):
+        request = self.context.get("request")
+        return (
+            request.build_absolute_uri(obj.cover_medium.url)
+            if obj.cover_medium
+            else None
+        )
+
+
+class EventListFullImageSerializer(EventListSerializer):
+    def get_cover(self, obj: Event):
+        request = self.context.get("request")
+        return request.build_absolute_uri(obj.cover.url) if obj.cover else None
+
+
 class EventCreateUpdateSerializer(serializers.ModelSerializer):
     country_name = serializers.CharField(write_only=True)
     city_name = serializers.CharField(write_only=True)
@@ -472,6 +515,8 @@ class EventCreateUpdateSerializer(serializers.ModelSerializer):
         if not isinstance(validated_data.get("cover"), InMemoryUploadedFile):
             validated_data.pop("cover", None)
 
+        # счётчики могли измениться после загрузки события
+        instance.refresh_from_db(fields=Event.PARTICIPANTS_COUNTERS)
         instance = super().update(instance, validated_data)
         HistoryLog.objects.log_actions(
             user_id=self.context["user"].pk,
@@ -518,16 +563,16 @@ class FilterQuerySerializer(Serializer):
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
+        # темы и быстрые фильтры берутся из кэша справочников
         if categories := data.pop("category", None):
-            filtered_themes = Theme.objects.filter(
-                categories__id__in=categories
-            ).distinct()
-            data["themes"] = ThemeCategoriesSerializer(
-                filtered_themes, many=True, context={"categories": categories}
-            ).data
+            data["themes"] = catalog.get_themes_by_categories(categories)
         if fast_filters := data.get("fast_filters"):
-            filters = EventFastFilter.objects.filter(id__in=fast_filters)
-            data["fast_filters"] = EventFastFilterSerializer(filters, many=True).data
+            all_filters = catalog.get_fast_filters()
+            data["fast_filters"] = [
+                {key: all_filters[i][key] for key in ("id", "name", "title")}
+                for i in sorted(set(fast_filters))
+                if i in all_filters
+            ]
         return data
 
 
@@ -598,6 +643,7 @@ class EventCancelSerializer(ModelSerializer):
 
         if participant.is_organizer:
             instance.is_draft = True  # возврат организатору в сигнале
+            instance.refresh_from_db(fields=Event.PARTICIPANTS_COUNTERS)
             instance.save()
             change_message = "Отменил событие"
         else:
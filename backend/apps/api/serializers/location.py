@@ -68,6 +68,28 @@ class LocationDocumentSerializer(DocumentSerializer):
         return request.build_absolute_uri(obj.cover) if obj.cover else None
 
 
+class LocationListSerializer(ModelSerializer):
+    """Список мест из БД при недоступном индексе."""
+
+    cover = SerializerMethodField()
+
+    class Meta:
+        model = Location
+        fields = [
+            "id",
+            "cover",
+            "name",
+            "latitude",
+            "longitude",
+            "address",
+            "discount",
+        ]
+
+    def get_cover(self, obj: Location):
+        request = self.context.get("request")
+        return request.build_absolute_uri(obj.cover.url) if obj.cover else None
+
+
 class LocationCreateSerializer(ModelSerializer):
     cover = NameImageField(validators=[validate_file_size])
 
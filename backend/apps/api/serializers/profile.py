@@ -8,6 +8,7 @@ from rest_framework.exceptions import ValidationError
 from apps.api.models import User, EventParticipant
 from apps.api.serializers import CategorySerializer, CitySerializer, CountrySerializer
 from apps.coins.serializers import WalletSerializer
+from apps.notifications.counters import get_unread_notify
 from core.utils import validate_file_size
 
 
@@ -99,7 +100,7 @@ class ProfileRetrieveSerializer(serializers.ModelSerializer):
         ]
 
     def get_unread_notify(self, obj: User):
-        return obj.notifications.filter(read=False).count()
+        return get_unread_notify(obj)
 
     def get_stats(self, obj: User):
         participation = EventParticipant.objects.filter(
@@ -0,0 +1,112 @@
+from copy import deepcopy
+from functools import lru_cache
+
+from django.db import models
+from django.utils.timezone import localtime
+from elasticsearch_dsl import Q
+
+from apps.api.enums import SearchBackend
+from apps.api.models import Category, EventFastFilter, Theme
+from apps.api.models.filters import (
+    combine_filter_queries,
+    get_db_filter_queries,
+    get_search_filter_queries,
+    get_user_city_id,
+)
+from core.cache import build_key, get_namespace_version, get_or_compute
+
+# справочники ленты меняются редко, поэтому хранятся в памяти процесса
+# и в Redis; правило инвалидации "catalog" повышает версию пространства
+# имён, после чего оба уровня перечитываются
+CATALOG_NAMESPACE = "catalog"
+CATALOG_TIMEOUT = 60 * 60 * 24
+
+_local_cache = {}
+
+
+def get_or_load(key, loader):
+    version = get_namespace_version(CATALOG_NAMESPACE)
+    local_version, value = _local_cache.get(key, (None, None))
+    if local_version == version:
+        return value
+
+    value = get_or_compute(
+        build_key(CATALOG_NAMESPACE, key), loader, timeout=CATALOG_TIMEOUT
+    )
+    _local_cache[key] = (version, value)
+    return value
+
+
+def load_fast_filters():
+    return {
+        f.id: {
+            "id": f.id,
+            "name": f.name,
+            "title": f.title,
+            "is_active": f.is_active,
+        }
+        for f in EventFastFilter.objects.order_by("id")
+    }
+
+
+def load_themes():
+    themes = Theme.objects.order_by("id").prefetch_related(
+        models.Prefetch("categories", queryset=Category.objects.order_by("title"))
+    )
+    return [
+        {
+            "id": theme.id,
+            "title": theme.title,
+            "categories": [
+                {"id": c.id, "title": c.title} for c in theme.categories.all()
+            ],
+        }
+        for theme in themes
+    ]
+
+
+def get_fast_filters() -> dict[int, dict]:
+    """Все быстрые фильтры по id."""
+    return get_or_load("fast_filters", load_fast_filters)
+
+
+def get_themes() -> list[dict]:
+    """Темы с категориями, отсортированными по названию."""
+    return get_or_load("themes", load_themes)
+
+
+def get_themes_by_categories(category_ids) -> list[dict]:
+    """Темы выбранных категорий в формате ThemeCategoriesSerializer."""
+    category_ids = set(category_ids)
+    themes = []
+    for theme in get_themes():
+        categories = [c for c in theme["categories"] if c["id"] in category_ids]
+        if categories:
+            themes.append({**theme, "categories": categories})
+    return themes
+
+
+@lru_cache(maxsize=256)
+def compile_filter_query(names: frozenset, date, city_id, backend: SearchBackend):
+    if backend == SearchBackend.DATABASE:
+        return combine_filter_queries(
+            names, get_db_filter_queries(date, city_id), models.Q()
+        )
+    return combine_filter_queries(names, get_search_filter_queries(date, city_id), Q())
+
+
+def get_filter_query(filter_ids, user, backend=SearchBackend.ELASTICSEARCH):
+    """
+    Условие быстрых фильтров без обращения к БД. Запрос собирается
+    один раз на набор фильтров, дату и город пользователя.
+    """
+    fast_filters = get_fast_filters()
+    names = frozenset(
+        fast_filters[i]["name"]
+        for i in filter_ids
+        if i in fast_filters and fast_filters[i]["is_active"]
+    )
+    query = compile_filter_query(
+        names, localtime().date(), get_user_city_id(user), backend
+    )
+    return deepcopy(query)
@@ -0,0 +1,30 @@
+import hashlib
+import json
+
+from django.conf import settings
+
+from core.cache import build_key, request_key_parts
+
+# правило инвалидации "event_feed" сбрасывает все выдачи ленты сразу
+FEED_NAMESPACE = "event_feed"
+
+
+def get_feed_cache_key(request) -> str:
+    """
+    Ключ выдачи: нормализованные параметры запроса, хост (адреса обложек
+    абсолютные) и пользователь. Для аутентифицированных выдача зависит
+    от пола, города и участия в событиях, поэтому кэшируется отдельно
+    для каждого пользователя.
+    """
+    return build_key(FEED_NAMESPACE, request_key_parts(request, user=True, host=True))
+
+
+def get_feed_timeout(request) -> int:
+    if request.user.is_authenticated:
+        return settings.EVENT_FEED_CACHE_USER_TIMEOUT
+    return settings.EVENT_FEED_CACHE_TIMEOUT
+
+
+def get_etag(data) -> str:
+    content = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    return '"%s"' % hashlib.md5(content.encode()).hexdigest()
@@ -2,7 +2,6 @@ import mimetypes
 from django.db.models.signals import post_delete, pre_save, post_save, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
-from django_elasticsearch_dsl.registries import registry
 
 from apps.api.models import (
     EventParticipant,
@@ -10,8 +9,6 @@ from apps.api.models import (
     User,
     Location,
     EventMedia,
-    City,
-    Country,
     EventAdminProxy,
 )
 from apps.api.services import generate_video_preview
@@ -20,14 +17,43 @@ from apps.api.services.payment import (
     do_payment_refund,
 )
 from apps.chat.models import Chat
-from core.cache.functools import delete_cache
 from core.utils import delete_file, delete_file_on_update
 from core.utils.old_instance import get_old_instance
 
 
+def update_participants_count(instance: EventParticipant, delta: int):
+    try:
+        gender = instance.user.gender
+    except User.DoesNotExist:
+        gender = None
+    Event.objects.filter(pk=instance.event_id).update_participants_count(gender, delta)
+    if EventParticipant.event.is_cached(instance):
+        try:
+            instance.event.refresh_from_db(fields=Event.PARTICIPANTS_COUNTERS)
+        except Event.DoesNotExist:
+            pass
+
+
+@receiver(post_save, sender=EventParticipant)
+def increment_participants_count(
+    sender, instance: EventParticipant, created: bool, **kwargs
+):
+    if created:
+        update_participants_count(instance, 1)
+
+
 @receiver(post_delete, sender=EventParticipant)
-def update_event_document(sender, instance: EventParticipant, **kwargs):
-    registry.update(instance.event)
+def decrement_participants_count(sender, instance: EventParticipant, **kwargs):
+    update_participants_count(instance, -1)
+
+
+@receiver(post_save, sender=User)
+def move_participants_count(sender, instance: User, created: bool, **kwargs):
+    if created or not instance.tracker.has_changed("gender"):
+        return
+    Event.objects.filter(participants__user=instance).move_participants_count(
+        instance.tracker.previous("gender"), instance.gender
+    )
 
 
 @receiver(post_delete, sender=EventParticipant)
@@ -143,21 +169,3 @@ def do_payment(sender, instance: Event, **kwargs):
 def refund_payment(sender, instance, **kwargs):
     if timezone.now() < instance.start_datetime:
         do_payment_refund(instance)
-
-
-@receiver(post_delete, sender=City)
-def delete_cities_cache_city_delete(instance, **kwargs):
-    delete_cache(f"country_cities_{instance.country_id}")
-
-
-@receiver(pre_save, sender=City)
-def delete_cities_cache_city_save(instance, **kwargs):
-    delete_cache(f"country_cities_{instance.country_id}")
-    old_instance = get_old_instance(instance)
-    if old_instance is not None:
-        delete_cache(f"country_cities_{old_instance.country_id}")
-
-
-@receiver(post_delete, sender=Country)
-def delete_cities_cache_country_deletion(instance, **kwargs):
-    delete_cache(f"country_cities_{instance.pk}")
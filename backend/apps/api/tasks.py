@@ -1,7 +1,19 @@
 from celery import shared_task
 from django.core.mail import send_mail
+from django_elasticsearch_dsl.registries import registry
 from config.settings import EMAIL_HOST_USER
 
+from apps.api.documents import EventDocument
+from apps.api.documents.lifecycle import (
+    alias_exists,
+    rebuild,
+    request_rebuild,
+)
+from apps.api.documents.queue import get_document_class, sync_documents
+from apps.api.models import Event
+from apps.api.services.feed import FEED_NAMESPACE
+from core.cache import bump_namespace
+
 
 @shared_task
 def send_mail_confirmation_code(email, code):
@@ -29,3 +41,36 @@ def send_email_support_answer(email, support_id, text):
 @shared_task
 def send_phone_confirmation_code(phone, code):
     pass
+
+
+@shared_task
+def sync_search_documents(document_label, pks):
+    success, errors = sync_documents(get_document_class(document_label), pks)
+    if document_label == EventDocument.__name__:
+        # лента читает индекс, поэтому сбрасывается после его обновления
+        bump_namespace(FEED_NAMESPACE)
+    return f"{document_label}: synced {success}, errors {len(errors)}"
+
+
+@shared_task
+def rebuild_search_index(document_label):
+    document_class = get_document_class(document_label)
+    # блокировку взял request_rebuild, rebuild снимает её по завершении
+    report = rebuild(document_class, lock_acquired=True)
+    if document_class is EventDocument:
+        bump_namespace(FEED_NAMESPACE)
+    return str(report)
+
+
+@shared_task
+def ensure_search_indices():
+    for document_class in registry.get_documents():
+        if not alias_exists(document_class):
+            request_rebuild(document_class)
+
+
+@shared_task
+def reconcile_participants_count():
+    # страховка от дрейфа, например при массовом изменении пола через update()
+    fixed = Event.objects.filter_not_expired().reconcile_participants_count()
+    return f"Fixed participants counters: {fixed}"
@@ -0,0 +1,59 @@
+from datetime import time
+from itertools import count
+
+from django.utils.timezone import localtime, timedelta
+
+from apps.api.enums import Gender
+from apps.api.models import City, Country, Event, EventParticipant, Location, User
+
+_phone_numbers = count(1)
+
+
+def create_user(**kwargs) -> User:
+    kwargs.setdefault("gender", Gender.MALE)
+    kwargs.setdefault("first_name", "Тест")
+    return User.objects.create_user(f"+7900{next(_phone_numbers):07d}", **kwargs)
+
+
+def create_location(country: Country | None = None, city: City | None = None):
+    if city is None:
+        if country is None:
+            country, _ = Country.objects.get_or_create(name="Страна")
+        city, _ = City.objects.get_or_create(name="Город", country=country)
+    return Location.objects.create(
+        name="Место",
+        address="Адрес",
+        latitude=55.75,
+        longitude=37.62,
+        country=city.country,
+        city=city,
+        status=Location.Status.VERIFIED,
+    )
+
+
+def create_event(organizer: User | None = None, days=1, categories=(), **kwargs):
+    """Событие через days дней от сегодняшнего в 12:00 с организатором."""
+    fields = {
+        "title": "Событие",
+        "short_description": "Краткое описание",
+        "description": "Описание",
+        "is_close_event": False,
+        "is_draft": False,
+        "min_age": 18,
+        "max_age": 60,
+        "date": localtime().date() + timedelta(days=days),
+        "start_time": time(12),
+        "end_time": time(14),
+    }
+    if "location" not in kwargs:
+        kwargs["location"] = create_location(kwargs.get("country"), kwargs.get("city"))
+    event = Event.objects.create(**{**fields, **kwargs})
+    if categories:
+        event.categories.set(categories)
+    if organizer is not None:
+        join(event, organizer, is_organizer=True)
+    return event
+
+
+def join(event: Event, user: User, **kwargs) -> EventParticipant:
+    return EventParticipant.objects.create(event=event, user=user, **kwargs)
@@ -0,0 +1,44 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.api.documents import EventDocument
+from apps.api.documents.bulk import index_id_range, iter_id_ranges
+from apps.api.models import Event
+
+from .factories import create_event
+
+
+@mock.patch("apps.api.documents.bulk.close_old_connections", mock.Mock())
+class BulkIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pks = sorted(create_event().pk for _ in range(7))
+
+    def setUp(self):
+        self.actions = []
+        patcher = mock.patch("apps.api.documents.bulk.bulk", side_effect=self.bulk)
+        self.bulk_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def bulk(self, client, actions, **kwargs):
+        self.actions += actions
+        return len(self.actions), []
+
+    def test_id_ranges_cover_all_objects(self):
+        ranges = list(iter_id_ranges(Event.objects.all(), 3))
+        self.assertEqual(ranges[0][0], self.pks[0])
+        self.assertGreater(ranges[-1][1], self.pks[-1])
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+
+    def test_range_is_sent_in_chunks(self):
+        result = index_id_range(
+            EventDocument, self.pks[0], self.pks[-1] + 1, "events-new", chunk_size=2
+        )
+        self.assertEqual(result, (len(self.pks), 0))
+        self.assertEqual(self.bulk_mock.call_args.kwargs["chunk_size"], 2)
+        self.assertEqual(
+            sorted(int(action["_id"]) for action in self.actions), self.pks
+        )
+        self.assertEqual({action["_index"] for action in self.actions}, {"events-new"})
@@ -0,0 +1,69 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.api.enums import Gender
+from apps.api.models import Category, City, Country, Location, Theme
+
+from .factories import create_event, create_user, join
+
+
+class EventDetailQueriesTests(APITestCase):
+    """Число запросов карточки события не зависит от числа участников."""
+
+    participants_count = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name="Страна")
+        city = City.objects.create(name="Город", country=country)
+        location = Location.objects.create(
+            name="Место",
+            address="Адрес",
+            latitude=55.75,
+            longitude=37.62,
+            country=country,
+            city=city,
+            status=Location.Status.VERIFIED,
+        )
+        theme = Theme.objects.create(title="Тема")
+        categories = [
+            Category.objects.create(title=f"Категория {i}", theme=theme)
+            for i in range(3)
+        ]
+
+        cls.organizer = create_user()
+        fields = {"location": location, "theme": theme, "categories": categories}
+        cls.small_event = create_event(cls.organizer, **fields)
+        cls.large_event = create_event(cls.organizer, **fields)
+        for i in range(cls.participants_count):
+            gender = Gender.MALE if i % 2 else Gender.FEMALE
+            join(cls.large_event, create_user(gender=gender), has_confirmed=True)
+
+    def get_detail(self, event):
+        response = self.client.get(
+            reverse("api:event-detail", kwargs={"event_pk": event.pk})
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response
+
+    def assert_same_queries(self, user=None):
+        self.client.force_authenticate(user)
+        # первый запрос заполняет счётчики непрочитанного в Redis
+        for event in (self.small_event, self.large_event):
+            self.get_detail(event)
+
+        with CaptureQueriesContext(connection) as context:
+            self.get_detail(self.small_event)
+        with self.assertNumQueries(len(context)):
+            response = self.get_detail(self.large_event)
+        self.assertEqual(
+            len(response.data["participants"]), self.participants_count + 1
+        )
+
+    def test_anonymous(self):
+        self.assert_same_queries()
+
+    def test_organizer(self):
+        self.assert_same_queries(self.organizer)
@@ -0,0 +1,341 @@
+from datetime import time
+from unittest import mock, skipUnless
+from uuid import uuid4
+
+from django.contrib.auth.models import AnonymousUser
+from django.urls import reverse
+from django.utils.timezone import localtime
+from elasticsearch.exceptions import ConnectionError as ESConnectionError
+from elasticsearch.exceptions import NotFoundError
+from elasticsearch_dsl.connections import connections
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from apps.api.documents import EventDocument
+from apps.api.enums import EventStatus, Gender, SearchBackend
+from apps.api.models import Category, City, Country, Event, EventFastFilter, Theme
+from apps.api.models.filters import FilterName
+from apps.api.services.catalog import CATALOG_NAMESPACE
+from apps.api.views.eventlist import (
+    CustomFilteringFilterBackend,
+    DatabaseFilteringBackend,
+)
+from core.cache import bump_namespace
+
+from .factories import create_event, create_user, join
+
+
+def elasticsearch_available() -> bool:
+    try:
+        return connections.get_connection().ping()
+    except Exception:
+        return False
+
+
+def get_feed_ids(data) -> set[int]:
+    """id событий из ответа ленты (группы по дням, страница или список)."""
+    events = data["events"]
+    if isinstance(events, dict):
+        events = events["results"]
+    ids = set()
+    for item in events:
+        if "results" in item:
+            ids.update(event["id"] for event in item["results"])
+        else:
+            ids.add(item["id"])
+    return ids
+
+
+class EventFeedTestData:
+    """
+    События для проверки фильтров ленты: опубликованные, закрытое,
+    черновик, неактивное, прошедшее и событие с участием пользователя.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.country = Country.objects.create(name="Страна")
+        cls.city = City.objects.create(name="Город", country=cls.country)
+        cls.other_city = City.objects.create(name="Другой город", country=cls.country)
+        theme = Theme.objects.create(title="Тема")
+        cls.category = Category.objects.create(title="Игры", theme=theme)
+        cls.other_category = Category.objects.create(title="Спорт", theme=theme)
+
+        cls.fast_filters = {
+            name: EventFastFilter.objects.create(name=name, is_active=True).pk
+            for name in FilterName
+        }
+        bump_namespace(CATALOG_NAMESPACE)
+
+        cls.user = create_user(city=cls.city)
+        cls.organizer = create_user(gender=Gender.FEMALE)
+
+        cls.tomorrow = create_event(
+            cls.organizer,
+            days=1,
+            title="Настольные игры",
+            country=cls.country,
+            city=cls.city,
+            categories=[cls.category],
+            max_age=30,
+        )
+        cls.later = create_event(
+            cls.organizer,
+            days=10,
+            title="Бег",
+            country=cls.country,
+            city=cls.other_city,
+            categories=[cls.other_category],
+            min_age=40,
+        )
+        cls.joined = create_event(
+            cls.organizer, days=4, city=cls.other_city, categories=[cls.category]
+        )
+        join(cls.joined, cls.user)
+        # прошло ли событие сегодня, зависит от времени запуска тестов
+        cls.today = create_event(
+            cls.organizer, days=0, start_time=time(23, 59), end_time=time(1)
+        )
+
+        cls.closed = create_event(cls.organizer, days=2, is_close_event=True)
+        cls.draft = create_event(cls.user, days=3, is_draft=True)
+        cls.inactive = create_event(cls.organizer, days=2, is_active=False)
+        cls.past = create_event(cls.organizer, days=-5)
+        join(cls.past, cls.user)
+
+    def expected(self, *events: Event) -> set[int]:
+        return {
+            event.pk
+            for event in events
+            if event is not self.today or self.today.start_datetime > localtime()
+        }
+
+    def get_cases(self):
+        """(параметры запроса, пользователь, ожидаемые события)."""
+        published = {"status": EventStatus.PUBLISHED}
+        feed = (self.tomorrow, self.later, self.joined, self.today)
+        filters = self.fast_filters
+        return [
+            (published, None, feed),
+            ({"status": EventStatus.POPULAR}, None, feed),
+            ({"status": EventStatus.UPCOMING}, self.user, (self.joined,)),
+            ({"status": EventStatus.PAST}, self.user, (self.past,)),
+            ({"status": EventStatus.DRAFT}, self.user, (self.draft,)),
+            (
+                {**published, "fast_filters": filters[FilterName.TOMORROW]},
+                None,
+                (self.tomorrow,),
+            ),
+            (
+                {**published, "fast_filters": filters[FilterName.TODAY]},
+                None,
+                (self.today,),
+            ),
+            (
+                {
+                    **published,
+                    "fast_filters": "%s,%s"
+                    % (filters[FilterName.TODAY], filters[FilterName.TOMORROW]),
+                },
+                None,
+                (self.today, self.tomorrow),
+            ),
+            (
+                {**published, "fast_filters": filters[FilterName.MY_CITY]},
+                self.user,
+                (self.tomorrow,),
+            ),
+            (
+                {
+                    **published,
+                    "fast_filters": "%s,%s"
+                    % (filters[FilterName.MY_CITY], filters[FilterName.TODAY]),
+                },
+                self.user,
+                (),
+            ),
+            (
+                {**published, "min_age": 35},
+                None,
+                (self.later, self.joined, self.today),
+            ),
+            (
+                {**published, "max_age": 25},
+                None,
+                (self.tomorrow, self.joined, self.today),
+            ),
+            (
+                {**published, "category__in": self.category.pk},
+                None,
+                (self.tomorrow, self.joined),
+            ),
+            (
+                {
+                    **published,
+                    "category__in": f"{self.category.pk}__{self.other_category.pk}",
+                },
+                None,
+                (self.tomorrow, self.later, self.joined),
+            ),
+            (
+                {**published, "city": self.other_city.pk},
+                None,
+                (self.later, self.joined),
+            ),
+            (
+                {**published, "country": self.country.pk},
+                None,
+                (self.tomorrow, self.later),
+            ),
+            (
+                {**published, "date": str(self.later.date)},
+                None,
+                (self.later,),
+            ),
+        ]
+
+
+class DatabaseFilteringBackendTests(EventFeedTestData, APITestCase):
+    def filter_events(self, params, user=None) -> list[int]:
+        request = Request(APIRequestFactory().get("/", params))
+        request.user = user or AnonymousUser()
+        queryset = DatabaseFilteringBackend().filter_queryset(
+            request, Event.objects.filter(is_active=True), None
+        )
+        return [event.pk for event in queryset]
+
+    def test_filters(self):
+        for params, user, events in self.get_cases():
+            with self.subTest(params=params):
+                self.assertEqual(
+                    set(self.filter_events(params, user)), self.expected(*events)
+                )
+
+    def test_search(self):
+        params = {"status": EventStatus.PUBLISHED, "search": "НАСТОЛЬН"}
+        self.assertEqual(self.filter_events(params), [self.tomorrow.pk])
+
+    def test_popular_ordering(self):
+        self.tomorrow.total_people = 10
+        self.tomorrow.save()
+        self.later.total_people = 2
+        self.later.save()
+        ids = self.filter_events({"status": EventStatus.POPULAR})
+        self.assertLess(ids.index(self.tomorrow.pk), ids.index(self.later.pk))
+
+
+class EventFeedBackendTests(EventFeedTestData, APITestCase):
+    url = reverse("api:event-list")
+
+    def setUp(self):
+        # кэш ленты не должен подменять результат между запросами
+        patcher = mock.patch(
+            "apps.api.views.eventlist.get_or_compute",
+            lambda key, compute, **kwargs: compute(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_feed(self, params, user=None):
+        self.client.force_authenticate(user)
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_database_backend(self):
+        with mock.patch.object(
+            CustomFilteringFilterBackend, "filter_queryset"
+        ) as es_filter:
+            data = self.get_feed(
+                {"status": EventStatus.PUBLISHED, "backend": SearchBackend.DATABASE}
+            )
+        es_filter.assert_not_called()
+        self.assertEqual(
+            get_feed_ids(data),
+            self.expected(self.tomorrow, self.later, self.joined, self.today),
+        )
+
+    def test_invalid_backend(self):
+        response = self.client.get(
+            self.url, {"status": EventStatus.PUBLISHED, "backend": "sphinx"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_fallback_on_connection_error(self):
+        with mock.patch.object(
+            CustomFilteringFilterBackend,
+            "filter_queryset",
+            side_effect=ESConnectionError("N/A", "connection refused", None),
+        ), mock.patch("apps.api.views.eventlist.request_rebuild") as rebuild:
+            data = self.get_feed({"status": EventStatus.UPCOMING}, self.user)
+        rebuild.assert_not_called()
+        self.assertEqual(get_feed_ids(data), {self.joined.pk})
+
+    def test_fallback_on_missing_index(self):
+        with mock.patch.object(
+            CustomFilteringFilterBackend,
+            "filter_queryset",
+            side_effect=NotFoundError(404, "index_not_found_exception", None),
+        ), mock.patch("apps.api.views.eventlist.request_rebuild") as rebuild:
+            data = self.get_feed({"status": EventStatus.PAST}, self.user)
+        rebuild.assert_called_once_with(EventDocument)
+        self.assertEqual(get_feed_ids(data), {self.past.pk})
+
+
+@skipUnless(elasticsearch_available(), "Elasticsearch недоступен")
+class SearchBackendParityTests(EventFeedTestData, APITestCase):
+    """Выдача Postgres совпадает с выдачей Elasticsearch на тех же данных."""
+
+    url = reverse("api:event-list")
+
+    @classmethod
+    def setUpClass(cls):
+        # документы пишутся во временный индекс, рабочий алиас не затрагивается
+        cls.index_patcher = mock.patch.object(
+            EventDocument._index, "_name", f"test-event-{uuid4().hex}"
+        )
+        cls.index_patcher.start()
+        EventDocument._index.create()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls.drop_index()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.drop_index()
+
+    @classmethod
+    def drop_index(cls):
+        EventDocument._index.delete(ignore=404)
+        cls.index_patcher.stop()
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        document = EventDocument()
+        document.update(document.get_queryset(), refresh=True)
+
+    def setUp(self):
+        patcher = mock.patch(
+            "apps.api.views.eventlist.get_or_compute",
+            lambda key, compute, **kwargs: compute(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_feed_ids(self, params, user, backend: SearchBackend) -> set[int]:
+        self.client.force_authenticate(user)
+        response = self.client.get(self.url, {**params, "backend": backend})
+        self.assertEqual(response.status_code, 200, response.data)
+        return get_feed_ids(response.data)
+
+    def test_parity(self):
+        for params, user, events in self.get_cases():
+            with self.subTest(params=params):
+                es_ids = self.get_feed_ids(params, user, SearchBackend.ELASTICSEARCH)
+                db_ids = self.get_feed_ids(params, user, SearchBackend.DATABASE)
+                self.assertEqual(db_ids, es_ids)
+                self.assertEqual(db_ids, self.expected(*events))
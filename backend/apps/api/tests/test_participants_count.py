@@ -0,0 +1,73 @@
+from django.test import TestCase
+
+from apps.api.enums import Gender
+from apps.api.models import Event
+from apps.api.serializers.event import EventCancelSerializer
+
+from .factories import create_event, create_user, join
+
+
+class ParticipantsCountTests(TestCase):
+    def setUp(self):
+        self.event = create_event(create_user(gender=Gender.FEMALE))
+        self.user = create_user(gender=Gender.MALE)
+
+    def assert_counters(self, male, female, total):
+        self.event.refresh_from_db(fields=Event.PARTICIPANTS_COUNTERS)
+        self.assertEqual(
+            (
+                self.event.participants_male,
+                self.event.participants_female,
+                self.event.participants_total,
+            ),
+            (male, female, total),
+        )
+
+    def test_join_and_leave(self):
+        participant = join(self.event, self.user)
+        self.assert_counters(1, 1, 2)
+        participant.delete()
+        self.assert_counters(0, 1, 1)
+
+    def test_gender_change(self):
+        participant = join(self.event, self.user)
+        self.user.gender = Gender.FEMALE
+        self.user.save()
+        self.assert_counters(0, 2, 2)
+
+        # выход после смены пола уменьшает актуальный счётчик
+        participant.user.refresh_from_db()
+        participant.delete()
+        self.assert_counters(0, 1, 1)
+
+    def test_gender_unset(self):
+        join(self.event, self.user)
+        self.user.gender = None
+        self.user.save()
+        self.assert_counters(0, 1, 2)
+
+    def test_decrement_does_not_go_below_zero(self):
+        participant = join(self.event, self.user)
+        Event.objects.filter(pk=self.event.pk).update(participants_male=0)
+        participant.delete()
+        self.assert_counters(0, 1, 1)
+
+    def test_reconcile(self):
+        join(self.event, self.user)
+        Event.objects.filter(pk=self.event.pk).update(
+            participants_male=5, participants_total=0
+        )
+        self.assertEqual(Event.objects.reconcile_participants_count(), 1)
+        self.assert_counters(1, 1, 2)
+
+    def test_stale_event_save_keeps_counters(self):
+        stale = Event.objects.get(pk=self.event.pk)
+        join(Event.objects.get(pk=self.event.pk), self.user)
+
+        # организатор отменяет событие, загруженное до записи участника
+        serializer = EventCancelSerializer(
+            stale, data={}, context={"user": stale.organizer}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assert_counters(1, 1, 2)
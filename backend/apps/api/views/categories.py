@@ -8,9 +8,11 @@ from apps.api.serializers import (
     ThemeSerializer,
 )
 from apps.api.models import Category, Occupation, Theme
+from core.cache import CachedListMixin
 
 
-class CategoryListView(ListAPIView):
+class CategoryListView(CachedListMixin, ListAPIView):
+    cache_namespace = "categories"
     permission_classes = [AllowAny]
     serializer_class = CategorySerializer
     filter_backends = [SearchFilter]
@@ -21,13 +23,15 @@ class CategoryListView(ListAPIView):
         return queryset
 
 
-class InterestListView(ListAPIView):
+class InterestListView(CachedListMixin, ListAPIView):
+    cache_namespace = "categories"
     permission_classes = [AllowAny]
     serializer_class = CategorySerializer
     queryset = Category.objects.order_by("title")
 
 
-class OccupationListView(ListAPIView):
+class OccupationListView(CachedListMixin, ListAPIView):
+    cache_namespace = "occupations"
     permission_classes = [AllowAny]
     serializer_class = OccupationSerializer
     filter_backends = [SearchFilter]
@@ -36,7 +40,8 @@ class OccupationListView(ListAPIView):
     queryset = Occupation.objects.all()
 
 
-class ThemeListView(ListAPIView):
+class ThemeListView(CachedListMixin, ListAPIView):
+    cache_namespace = "themes"
     permission_classes = [AllowAny]
     serializer_class = ThemeSerializer
     filter_backends = [SearchFilter]
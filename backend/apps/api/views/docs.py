@@ -8,9 +8,11 @@ from django.shortcuts import get_object_or_404, get_list_or_404
 
 from apps.api.models import Docs
 from apps.api.serializers import DocsSerializer
+from core.cache import CachedListMixin
 
 
-class DocsViewSet(ListModelMixin, UpdateModelMixin, GenericViewSet):
+class DocsViewSet(CachedListMixin, ListModelMixin, UpdateModelMixin, GenericViewSet):
+    cache_namespace = "docs"
     permission_classes = [IsAuthenticatedOrReadOnly]
     serializer_class = DocsSerializer
 
@@ -12,19 +12,22 @@ from django.shortcuts import get_object_or_404
 from apps.api.models import Event
 from apps.api.serializers import EventDetailSerializer, EventCreateUpdateSerializer
 from apps.api.permissions import IsEventOrganizer
+from apps.notifications.counters import get_unread_notify
 
 
 class EventDetailViewSet(
     RetrieveModelMixin, UpdateModelMixin, DestroyModelMixin, GenericViewSet
 ):
-    queryset = Event.objects.all()
+    queryset = Event.objects.prefetch_detail()
     serializer_class = {
         "retrieve": EventDetailSerializer,
         "partial_update": EventCreateUpdateSerializer,
     }
 
     def get_object(self):
-        event = get_object_or_404(Event, pk=self.kwargs["event_pk"], is_active=True)
+        event = get_object_or_404(
+            self.get_queryset(), pk=self.kwargs["event_pk"], is_active=True
+        )
         if event.is_draft and self.request.user != event.organizer:
             raise NotFound({"error": "Событие отменено или ещё не опубликовано"})
         return event
@@ -49,8 +52,7 @@ class EventDetailViewSet(
     def retrieve(self, request, *args, **kwargs):
         data = super().retrieve(request, *args, **kwargs).data
         if self.request.user.is_authenticated:
-            unread_notify = self.request.user.notifications.filter(read=False).count()
-            data["unread_notify"] = unread_notify
+            data["unread_notify"] = get_unread_notify(self.request.user)
         return Response(data)
 
     def destroy(self, request, *args, **kwargs):
@@ -2,7 +2,10 @@ import six
 import operator
 from itertools import groupby
 
-from django.core.management import call_command
+from django.conf import settings
+from django.db.models import F
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from django_elasticsearch_dsl.search import Search
 from django_elasticsearch_dsl_drf.viewsets import DocumentViewSet
 from django_elasticsearch_dsl_drf.filter_backends import (
@@ -11,26 +14,47 @@ from django_elasticsearch_dsl_drf.filter_backends import (
 )
 from django.utils.timezone import localtime, timedelta
 from elasticsearch_dsl import Q
+from elasticsearch.exceptions import ConnectionError as ESConnectionError
 from elasticsearch.exceptions import NotFoundError
 from rest_framework.mixins import CreateModelMixin
 from rest_framework.response import Response
+from rest_framework.status import HTTP_304_NOT_MODIFIED
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 
 from apps.api.serializers import (
     EventDocumentSerializer,
     EventCreateUpdateSerializer,
+    EventListSerializer,
     FilterQuerySerializer,
 )
 from apps.api.permissions import StatusPermissions
-from apps.api.enums import EventStatus
+from apps.api.enums import EventStatus, SearchBackend
 from apps.api.documents import EventDocument
-from apps.api.models import EventFastFilter
-from apps.api.serializers.event import EventDocumentFullImageSerializer
-from core.pagination import PageNumberSetPagination
+from apps.api.documents.lifecycle import request_rebuild
+from apps.api.models import Event
+from apps.api.models.event import EventQuerySet
+from apps.api.services import catalog, feed
+from apps.api.serializers.event import (
+    EventDocumentFullImageSerializer,
+    EventListFullImageSerializer,
+)
+from apps.notifications.counters import get_unread_notify
+from core.cache import get_or_compute
+from core.pagination import SearchAfterPagination, limit_results
 from core.utils import humanize_date
 
 
+def get_status(request):
+    status = request.query_params.get("status")
+    if status not in set(EventStatus):
+        raise ValidationError(
+            "Параметр 'status' не указан или имеет неверное значение. "
+            + f"Ожидаемые значения: {[e.value for e in EventStatus]}"
+        )
+    return status
+
+
 class CustomFilteringFilterBackend(FilteringFilterBackend):
     @classmethod
     def apply_query_in(cls, queryset, options, value):
@@ -52,9 +76,7 @@ class CustomFilteringFilterBackend(FilteringFilterBackend):
         query_params = request.query_params.dict()
         if "fast_filters" in query_params:
             fast_filters = list(map(int, query_params["fast_filters"].split(",")))
-            filter_query = EventFastFilter.objects.get_filter_query(
-                fast_filters, request.user
-            )
+            filter_query = catalog.get_filter_query(fast_filters, request.user)
             queryset = queryset.filter(filter_query)
         return queryset
 
@@ -62,15 +84,9 @@ class CustomFilteringFilterBackend(FilteringFilterBackend):
     def apply_status_filter(request, queryset):
         qs: Search = queryset.filter(Q("term", is_active=True))
         user = request.user
-        status = request.query_params.get("status")
+        status = get_status(request)
         search = request.query_params.get("search")
 
-        if status not in set(EventStatus):
-            raise ValidationError(
-                "Параметр 'status' не указан или имеет неверное значение. "
-                + f"Ожидаемые значения: {[e.value for e in EventStatus]}"
-            )
-
         # "Мои встречи": пользователь является участником/организатором
         if status in [EventStatus.UPCOMING, EventStatus.PAST, EventStatus.DRAFT]:
             qs = qs.filter(Q("term", **{"participants.user.id": user.id}))
@@ -98,8 +114,7 @@ class CustomFilteringFilterBackend(FilteringFilterBackend):
             else:
                 qs = qs.sort("start_datetime")
 
-        total = qs.count()
-        return qs[:total]
+        return limit_results(qs)
 
     @staticmethod
     def apply_age_filter(request, queryset):
@@ -112,20 +127,108 @@ class CustomFilteringFilterBackend(FilteringFilterBackend):
         return queryset
 
     def filter_queryset(self, request, queryset, view):
-        try:
-            queryset = super().filter_queryset(request, queryset, view)
-            queryset = self.apply_status_filter(request, queryset)
-            queryset = self.apply_fast_filters(request, queryset)
-            queryset = self.apply_age_filter(request, queryset)
-            return queryset
-        except NotFoundError:
-            call_command("search_index", "--rebuild", "-f")
-            return self.filter_queryset(request, queryset, view)
+        queryset = super().filter_queryset(request, queryset, view)
+        queryset = self.apply_status_filter(request, queryset)
+        queryset = self.apply_fast_filters(request, queryset)
+        queryset = self.apply_age_filter(request, queryset)
+        return queryset
+
+
+class DatabaseFilteringBackend:
+    """
+    Фильтрация ленты событий в Postgres: те же параметры, что у
+    CompoundSearchFilterBackend и CustomFilteringFilterBackend.
+    """
+
+    lookup_separator = "__"
+
+    @staticmethod
+    def apply_search(request, queryset: EventQuerySet):
+        if search := request.query_params.get("search"):
+            queryset = queryset.search(search)
+        return queryset
+
+    @classmethod
+    def apply_field_filters(cls, request, queryset: EventQuerySet):
+        query_params = request.query_params
+        if country := query_params.get("country"):
+            queryset = queryset.filter(country_id=country)
+        if city := query_params.get("city"):
+            queryset = queryset.filter(city_id=city)
+        if date := query_params.get("date"):
+            queryset = queryset.filter(date=date)
+
+        category = query_params.get("category__in") or query_params.get("category")
+        if category:
+            queryset = queryset.filter(
+                categories__id__in=category.split(cls.lookup_separator)
+            ).distinct()
+        return queryset
+
+    @staticmethod
+    def apply_status_filter(request, queryset: EventQuerySet):
+        user = request.user
+        status = get_status(request)
+        search = request.query_params.get("search")
+
+        if status in [EventStatus.UPCOMING, EventStatus.PAST, EventStatus.DRAFT]:
+            queryset = queryset.filter_participant(user)
+
+        queryset = queryset.filter(is_draft=status == EventStatus.DRAFT)
+
+        if status == EventStatus.PAST:
+            queryset = queryset.filter_past(days=None)
+        elif status != EventStatus.DRAFT:
+            queryset = queryset.filter_upcoming()
+
+        if status in [EventStatus.POPULAR, EventStatus.PUBLISHED]:
+            queryset = queryset.filter(is_close_event=False)
+
+        if not search:
+            if status == EventStatus.PAST:
+                queryset = queryset.order_by("-start_datetime")
+            elif status == EventStatus.POPULAR:
+                queryset = queryset.get_free_places().order_by(
+                    F("free_places").desc(nulls_last=True)
+                )
+            else:
+                queryset = queryset.order_by("start_datetime")
+
+        return queryset
+
+    @staticmethod
+    def apply_fast_filters(request, queryset: EventQuerySet):
+        query_params = request.query_params.dict()
+        if "fast_filters" in query_params:
+            fast_filters = list(map(int, query_params["fast_filters"].split(",")))
+            filter_query = catalog.get_filter_query(
+                fast_filters, request.user, SearchBackend.DATABASE
+            )
+            queryset = queryset.filter(filter_query)
+        return queryset
+
+    @staticmethod
+    def apply_age_filter(request, queryset: EventQuerySet):
+        min_age = request.query_params.get("min_age")
+        max_age = request.query_params.get("max_age")
+        if min_age:
+            queryset = queryset.filter(max_age__gte=min_age)
+        if max_age:
+            queryset = queryset.filter(min_age__lte=max_age)
+        return queryset
+
+    def filter_queryset(self, request, queryset, view):
+        queryset = self.apply_search(request, queryset)
+        queryset = self.apply_field_filters(request, queryset)
+        queryset = self.apply_status_filter(request, queryset)
+        queryset = self.apply_fast_filters(request, queryset)
+        queryset = self.apply_age_filter(request, queryset)
+        return queryset.prefetch_list()
 
 
 class EventListViewSet(CreateModelMixin, DocumentViewSet):
     document = EventDocument
-    pagination_class = PageNumberSetPagination
+    pagination_class = SearchAfterPagination
     serializer_class = {
         "list": EventDocumentSerializer,
         "create": EventCreateUpdateSerializer,
@@ -148,6 +251,9 @@ class EventListViewSet(CreateModelMixin, DocumentViewSet):
 
     search_fields = ("title", "short_description")
 
+    search_backend = SearchBackend(settings.EVENT_SEARCH_BACKEND)
+    search_backend_query_param = "backend"
+
     def get_queryset(self):
         return super().get_queryset().filter("term", is_active=True)
 
@@ -160,6 +266,8 @@ class EventListViewSet(CreateModelMixin, DocumentViewSet):
         return super(EventListViewSet, self).get_permissions()
 
     def get_serializer_class(self):
+        if self.action == "list" and self.search_backend == SearchBackend.DATABASE:
+            return EventListSerializer
         return self.serializer_class[self.action]
 
     def get_serializer_context(self):
@@ -168,33 +276,48 @@ class EventListViewSet(CreateModelMixin, DocumentViewSet):
         return context
 
     def _list_queryset(self, request, queryset):
-        page = self.paginate_queryset(queryset)
-        if page is not None and "page" in request.query_params:
+        if self.paginator.is_requested(queryset, request):
+            page = self.paginate_queryset(queryset)
             serializer = self.get_serializer(
                 page, many=True, context=self.get_serializer_context()
             )
             response = self.get_paginated_response(serializer.data)
         else:
             serializer = self.get_serializer(
-                queryset, many=True, context=self.get_serializer_context()
+                limit_results(queryset),
+                many=True,
+                context=self.get_serializer_context(),
             )
             response = Response({"results": serializer.data})
         return response
 
+    def _filter_events(self):
+        if self.search_backend == SearchBackend.DATABASE:
+            return DatabaseFilteringBackend().filter_queryset(
+                self.request, Event.objects.filter(is_active=True), self
+            )
+        return self.filter_queryset(self.get_queryset())
+
+    def _split_by_date(self, queryset, date):
+        if self.search_backend == SearchBackend.DATABASE:
+            return queryset.filter(date__lt=date), queryset.filter(date__gte=date)
+        return (
+            queryset.filter(Q("range", date={"lt": date})),
+            queryset.filter(Q("range", date={"gte": date})),
+        )
+
     def _list_published(self, request):
-        queryset: Search = self.filter_queryset(self.get_queryset())
+        queryset = self._filter_events()
 
         # Разделение на ближайшие и более поздние
         next_week = localtime().date() + timedelta(days=7)
-        soon = queryset.filter(Q("range", date={"lt": next_week}))
-        later = queryset.filter(Q("range", date={"gte": next_week}))
+        soon, later = self._split_by_date(queryset, next_week)
 
-        # Группировка ближайших событий по дням
+        # Группировка ближайших событий по дням: выборка за неделю запрашивается
+        # из индекса один раз, группы собираются в памяти
         grouped_events = []
-        for date, events in groupby(soon, lambda e: e.date):
-            ids = [e.id for e in events]
-            events_queryset = queryset.filter("terms", id=ids)
-            response = self._list_queryset(request, events_queryset)
+        for date, events in groupby(limit_results(soon), lambda e: str(e.date)):
+            response = self._list_queryset(request, list(events))
             grouped_events.append({"date": humanize_date(date), **response.data})
 
         # Добавление более поздних событий
@@ -213,36 +336,81 @@ class EventListViewSet(CreateModelMixin, DocumentViewSet):
         response_data["filters"] = serializer.data
         return response_data
 
-    def _list_popular(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
+    def _list_paginated(self, request, serializer_class):
+        queryset = self._filter_events()
 
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = EventDocumentFullImageSerializer(
+            serializer = serializer_class(
                 page, many=True, context=self.get_serializer_context()
             )
             return {"events": self.get_paginated_response(serializer.data).data}
 
-        serializer = EventDocumentFullImageSerializer(
-            queryset, many=True, context=self.get_serializer_context()
+        serializer = serializer_class(
+            limit_results(queryset), many=True, context=self.get_serializer_context()
         )
         return {"events": serializer.data}
 
-    def list(self, request, *args, **kwargs):
+    def _list_popular(self, request):
+        if self.search_backend == SearchBackend.DATABASE:
+            return self._list_paginated(request, EventListFullImageSerializer)
+        return self._list_paginated(request, EventDocumentFullImageSerializer)
+
+    def _list_events(self, request):
         status = request.query_params.get("status", None)
         if status == EventStatus.PUBLISHED:
-            response_data = self._list_published(request)
-        elif status == EventStatus.POPULAR:
-            response_data = self._list_popular(request)
-        else:
-            response = super().list(request, *args, **kwargs)
-            response_data = {"events": response.data}
+            return self._list_published(request)
+        if status == EventStatus.POPULAR:
+            return self._list_popular(request)
+        return self._list_paginated(request, self.get_serializer_class())
+
+    def get_search_backend(self):
+        backend = self.request.query_params.get(self.search_backend_query_param)
+        if backend is None:
+            return self.search_backend
+        if backend not in set(SearchBackend):
+            raise ValidationError(
+                f"Параметр '{self.search_backend_query_param}' имеет неверное "
+                + f"значение. Ожидаемые значения: {[e.value for e in SearchBackend]}"
+            )
+        return SearchBackend(backend)
+
+    def get_feed(self, request):
+        return get_or_compute(
+            feed.get_feed_cache_key(request),
+            lambda: self._get_feed(request),
+            timeout=feed.get_feed_timeout(request),
+            lock_timeout=5,
+        )
+
+    def _get_feed(self, request):
+        self.search_backend = self.get_search_backend()
+        try:
+            return self._list_events(request)
+        except (NotFoundError, ESConnectionError) as e:
+            if self.search_backend == SearchBackend.DATABASE:
+                raise
+            # индекс отсутствует или Elasticsearch недоступен: лента
+            # отдаётся из БД, отсутствующий индекс перестраивается в фоне
+            if isinstance(e, NotFoundError):
+                request_rebuild(EventDocument)
+            self.search_backend = SearchBackend.DATABASE
+            return self._list_events(request)
+
+    def list(self, request, *args, **kwargs):
+        response_data = {**self.get_feed(request)}
 
         # Добавление прочих данных для аутентифицированных пользователей
         user = request.user
         if user.is_authenticated:
-            unread_notify = user.notifications.filter(read=False).count()
-            response_data["unread_notify"] = unread_notify
+            response_data["unread_notify"] = get_unread_notify(user)
             response_data["event_rules_applied"] = user.event_rules_applied
 
-        return Response(response_data)
+        etag = feed.get_etag(response_data)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(response_data)
+        response["ETag"] = etag
+        patch_cache_control(response, no_cache=True, private=user.is_authenticated)
+        return response
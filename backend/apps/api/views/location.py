@@ -1,4 +1,4 @@
-from django.core.management import call_command
+from django.db.models import Q
 from django_elasticsearch_dsl_drf.filter_backends import (
     GeoSpatialOrderingFilterBackend,
     FilteringFilterBackend,
@@ -10,22 +10,31 @@ from rest_framework.filters import SearchFilter
 from rest_framework.generics import ListAPIView
 from rest_framework.mixins import CreateModelMixin
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
 
 from apps.admin_history.models import HistoryLog, ActionFlag
 from apps.api.documents import LocationDocument
+from apps.api.documents.lifecycle import request_rebuild
 from apps.api.models import Country, City, Location
 from apps.api.serializers import (
     LocationDocumentSerializer,
+    LocationListSerializer,
     LocationCreateSerializer,
     CountrySerializer,
     CitySerializer,
 )
-from core.cache.functools import get_or_cache
+from core.cache import CachedListMixin
+from core.pagination import SearchAfterPagination, limit_results
 from .mixins import LocationMixin
 
 
+class LocationPagination(SearchAfterPagination):
+    page_query_required = True
+
+
 class LocationListViewSet(CreateModelMixin, DocumentViewSet):
     document = LocationDocument
+    pagination_class = LocationPagination
     serializer_class = {
         "list": LocationDocumentSerializer,
         "create": LocationCreateSerializer,
@@ -55,20 +64,42 @@ class LocationListViewSet(CreateModelMixin, DocumentViewSet):
         return super().get_permissions()
 
     def get_queryset(self):
-        try:
-            qs = super().get_queryset().filter("term", status=Location.Status.VERIFIED)
-            query_params = self.request.query_params
-            if not query_params.get("search") and not query_params.get("ordering"):
-                qs = qs.sort("-id")
-            total = qs.count()
-            return qs[:total]
-        except NotFoundError:
-            call_command("search_index", "--rebuild", "-f")
-            return self.get_queryset()
+        qs = super().get_queryset().filter("term", status=Location.Status.VERIFIED)
+        query_params = self.request.query_params
+        if not query_params.get("search") and not query_params.get("ordering"):
+            qs = qs.sort("-id")
+        return limit_results(qs)
 
     def get_serializer_class(self):
         return self.serializer_class[self.action]
 
+    def list(self, request, *args, **kwargs):
+        try:
+            return super().list(request, *args, **kwargs)
+        except NotFoundError:
+            # индекс перестраивается в фоне, до его появления места отдаются из БД
+            request_rebuild(LocationDocument)
+            return self.list_from_database(request)
+
+    def list_from_database(self, request):
+        queryset = Location.objects.filter(status=Location.Status.VERIFIED)
+        if city := request.query_params.get("city"):
+            queryset = queryset.filter(city_id=city)
+        if search := request.query_params.get("search"):
+            queryset = queryset.filter(
+                Q(name__icontains=search) | Q(address__icontains=search)
+            )
+        queryset = limit_results(queryset.order_by("-id"))
+
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = LocationListSerializer(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = LocationListSerializer(queryset, many=True, context=context)
+        return Response(serializer.data)
+
     def perform_create(self, serializer):
         instance = serializer.save(user=self.request.user)
         HistoryLog.objects.log_actions(
@@ -80,7 +111,8 @@ class LocationListViewSet(CreateModelMixin, DocumentViewSet):
         )
 
 
-class CountryListView(LocationMixin, ListAPIView):
+class CountryListView(CachedListMixin, LocationMixin, ListAPIView):
+    cache_namespace = "countries"
     permission_classes = [AllowAny]
     serializer_class = CountrySerializer
     filter_backends = [SearchFilter]
@@ -88,8 +120,13 @@ class CountryListView(LocationMixin, ListAPIView):
 
     queryset = Country.objects.order_by("name")
 
+    def is_cacheable(self):
+        # выдача с фильтром зависит от актуальных событий и пола пользователя
+        return not self.check_filter()
 
-class CityListView(LocationMixin, ListAPIView):
+
+class CityListView(CachedListMixin, LocationMixin, ListAPIView):
+    cache_namespace = "cities"
     permission_classes = [AllowAny]
     serializer_class = CitySerializer
     filter_backends = [SearchFilter]
@@ -97,13 +134,8 @@ class CityListView(LocationMixin, ListAPIView):
 
     queryset = City.objects.order_by("name")
 
-    def get(self, request, *args, **kwargs):
-        if self.check_filter():
-            return super().get(request, *args, **kwargs)
-
-        return get_or_cache(f"country_cities_{self.kwargs['pk']}", 60 * 60 * 24)(
-            super().get
-        )(request, *args, **kwargs)
+    def is_cacheable(self):
+        return not self.check_filter()
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -92,7 +92,7 @@ class EventParticipantView(
     def confirm_marking(self):
         event = self.get_object()
         event.did_organizer_marking = True
-        event.save()
+        event.save(update_fields=["did_organizer_marking"])
 
     def get(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
@@ -1,15 +1,21 @@
 import json
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.db import transaction
-from django.db.models import Q
 
 from apps.admin_history.models import HistoryLog, ActionFlag
-from apps.chat.models import ReadMessage, Message, Chat
-from apps.chat.serializers import MessageSendSerializer, MessageSerializer
-from apps.chat.utils import send_ws_message, send_ws_unread_messages
+from apps.chat.models import ChatReadCursor, Message, Chat
+from apps.chat.payloads import build_message_payload, render_message
+from apps.chat.serializers import MessageSendSerializer
+from apps.chat.tracing import trace
+from apps.chat import counters
+from apps.chat.utils import aget_recipients, asend_ws_message, asend_ws_unread_messages
+from apps.notifications.counters import get_unread_notify
 from apps.notifications.models import UserNotification
-from apps.api.models import Event
+from apps.api.models import Event, EventParticipant
+
+# журнал действий пишет связанные объекты синхронно
+alog_actions = database_sync_to_async(HistoryLog.objects.log_actions)
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
@@ -42,14 +48,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         )
 
     async def send_unread_messages(self):
-        chat_ids = [
-            int(group.split("_")[-1])
-            for group in self.room_group_names
-            if "chat" in group
-        ]
-        unread = 0
-        for chat_id in chat_ids:
-            unread += await self.get_unread_messages_count(chat_id)
+        unread = await self.get_unread_messages_count()
         await self.channel_layer.group_send(
             "user_%s" % self.user.id,
             {
@@ -89,10 +88,15 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.leave_chat(text_data_json)
 
     async def chat_message(self, event):
-        with open("log.txt", "a") as f:
-            event = await self.add_user_info(event)
-            f.write(f"Sending message from chat_message to {self.user}: {event}\n")
-        await self.send(text_data=json.dumps(event, ensure_ascii=False))
+        recipient = event["recipients"].get(str(self.user.pk))
+        if recipient is None:
+            # получатель присоединился после рассылки
+            recipient = await self.get_recipient(event["chat"])
+        text_data = render_message(
+            event["payload"], is_mine=event["sender"] == self.user.pk, **recipient
+        )
+        trace("message_deliver", user=self.user.pk, message=event["message_id"])
+        await self.send(text_data=text_data)
 
     async def user_notification(self, event):
         await self.send(text_data=json.dumps(event, ensure_ascii=False))
@@ -103,47 +107,43 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def messages(self, event):
         await self.send(text_data=json.dumps(event, ensure_ascii=False))
 
-    @database_sync_to_async
-    def add_user_info(self, data):
-        # TODO: попробовать без этого
-        with transaction.atomic():
-            is_mine = self.user.id == data["message"]["sender"]["id"]
-
-            data["message"]["is_mine"] = is_mine
-
-            chat = Chat.objects.get(pk=data["message"]["chat"])
-            participant = chat.event.get_participant(user=self.user)
-            data["message"]["send_notification"] = participant.chat_notifications
-            data["message"]["unread"] = chat.messages.filter(
-                ~Q(read__user=self.user)
-            ).count()
-            return data
-
-    @database_sync_to_async
-    def save_and_send_message(self, data):
-        try:
-            chat = Chat.objects.get(pk=data["message"]["event_id"])
-        except Chat.DoesNotExist:
+    async def get_recipient(self, chat_id):
+        participant = await EventParticipant.objects.filter(
+            event_id=chat_id, user=self.user
+        ).afirst()
+        unread = await sync_to_async(counters.get_unread_count)(self.user, chat_id)
+        return {
+            "send_notification": (
+                participant is not None and participant.chat_notifications
+            ),
+            "unread": unread,
+        }
+
+    async def save_and_send_message(self, data):
+        chat = (
+            await Chat.objects.select_related("event")
+            .filter(pk=data["message"]["event_id"])
+            .afirst()
+        )
+        if chat is None:
             return
 
-        if not chat.event.get_participant(user=self.user):
+        is_participant = await EventParticipant.objects.filter(
+            event_id=chat.pk, user=self.user
+        ).aexists()
+        if not is_participant:
             return
 
-        send_serializer = MessageSendSerializer(
-            data=data["message"],
-            context={
-                "chat": chat,
-                "sender": self.user,
-                "is_info": False,
-                "is_incoming": False,
-            },
-        )
+        send_serializer = MessageSendSerializer(data=data["message"])
         send_serializer.is_valid(raise_exception=True)
-        message = send_serializer.save()
-        _, created = ReadMessage.objects.get_or_create(
-            message=message, user=message.sender
+        message = await Message.objects.acreate(
+            chat=chat,
+            sender=self.user,
+            text=send_serializer.validated_data["text"],
+            is_info=False,
+            is_incoming=False,
         )
-        HistoryLog.objects.log_actions(
+        await alog_actions(
             user_id=self.user.pk,
             queryset=[message],
             action_flag=ActionFlag.ADDITION,
@@ -151,47 +151,44 @@ class ChatConsumer(AsyncWebsocketConsumer):
             is_admin=False,
         )
 
-        headers = dict(self.scope["headers"])
-        message_serializer = MessageSerializer(
-            instance=message, context={"user": self.user, "headers": headers}
+        host = dict(self.scope["headers"]).get(b"host")
+        payload = await sync_to_async(build_message_payload)(
+            message, host.decode() if host else None
+        )
+        await asend_ws_message(
+            message, payload, self.channel_layer, await aget_recipients(chat.pk)
         )
-        with open("log.txt", "a") as f:
-            f.write(f"Sending message from consumer: {message_serializer.data}\n")
-
-        send_ws_message(message_serializer.data, chat.pk)
-        if created:
-            send_ws_unread_messages(message.sender)
 
     async def join_chat(self, data):
         group_name = "chat_%s" % data["event_id"]
-        with open("log.txt", "a") as f:
-            f.write(f"{self.user} connected to group: {group_name}\n")
+        trace("group_join", user=self.user.pk, group=group_name)
         await self.channel_layer.group_add(
             group_name,
             self.channel_name,
         )
 
     async def leave_chat(self, data):
-        with open("log.txt", "a") as f:
-            f.write(f"{self.user} disconnected from group: {data['group']}\n")
+        trace("group_leave", user=self.user.pk, group=data["group"])
         await self.channel_layer.group_discard(
             data["group"],
             self.channel_name,
         )
 
-    @database_sync_to_async
-    def read_message(self, data):
-        try:
-            message = Message.objects.get(id=data["message_id"])
-        except Message.DoesNotExist:
+    async def read_message(self, data):
+        message = (
+            await Message.objects.select_related("chat__event", "sender")
+            .filter(id=data["message_id"])
+            .afirst()
+        )
+        if message is None:
             return
-        _, created = ReadMessage.objects.get_or_create(
-            user=self.user,
-            message=message,
+        advanced = await ChatReadCursor.objects.aadvance(
+            message.chat_id, self.user, message.pk
         )
-        if created:
-            send_ws_unread_messages(self.user)
-            HistoryLog.objects.log_actions(
+        if advanced:
+            await sync_to_async(counters.reset_unread)(self.user.pk, message.chat_id)
+            await asend_ws_unread_messages(self.user, self.channel_layer)
+            await alog_actions(
                 user_id=self.user.pk,
                 queryset=[message],
                 action_flag=ActionFlag.CHANGE,
@@ -199,15 +196,15 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 is_admin=False,
             )
 
-    @database_sync_to_async
-    def read_notification(self, data):
-        try:
-            notification = UserNotification.objects.get(id=data["notification_id"])
-        except UserNotification.DoesNotExist:
+    async def read_notification(self, data):
+        notification = await UserNotification.objects.filter(
+            id=data["notification_id"]
+        ).afirst()
+        if notification is None:
             return
         notification.read = True
-        notification.save()
-        HistoryLog.objects.log_actions(
+        await notification.asave()
+        await alog_actions(
             user_id=self.user.pk,
             queryset=[notification],
             action_flag=ActionFlag.CHANGE,
@@ -215,47 +212,29 @@ class ChatConsumer(AsyncWebsocketConsumer):
             is_admin=False,
         )
 
-    @database_sync_to_async
-    def chat_notifications(self, data):
-        try:
-            chat = Chat.objects.get(pk=data["chat_id"])
-        except Chat.DoesNotExist:
-            return
-
-        participant = chat.event.get_participant(user=self.user)
+    async def chat_notifications(self, data):
+        participant = await EventParticipant.objects.filter(
+            event_id=data["chat_id"], user=self.user
+        ).afirst()
         if not participant:
             return
 
         participant.chat_notifications = data["enabled"]
-        participant.save()
+        await participant.asave()
 
-    @database_sync_to_async
-    def get_user_groups(self):
+    async def get_user_groups(self):
         events = (
             Event.objects.filter_participant(self.user)
             .filter(is_draft=False, is_active=True)
             .filter_not_expired()
-            .distinct()
         )
-        groups = ["chat_%s" % id for id in events.values_list("id")]
+        groups = ["chat_%s" % pk async for pk in events.values_list("id", flat=True)]
         groups += [f"user_{self.user.id}"]
-        with open("log.txt", "a") as f:
-            f.write(f"{self.user} groups: {groups}\n")
+        trace("user_groups", user=self.user.pk, groups=groups)
         return groups
 
-    @database_sync_to_async
-    def get_unread_notifications_count(self):
-        return self.user.notifications.filter(read=False).count()
+    async def get_unread_notifications_count(self):
+        return await sync_to_async(get_unread_notify)(self.user)
 
-    @database_sync_to_async
-    def get_unread_messages_count(self, chat_id):
-        try:
-            chat = Chat.objects.get(
-                pk=chat_id, event__is_draft=False, event__is_active=True
-            )
-            unread = chat.messages.filter(~Q(read__user=self.user)).count()
-            with open("log.txt", "a") as f:
-                f.write(f"Chat: {chat.event.title}, unread: {unread}")
-            return unread
-        except Chat.DoesNotExist:
-            return 0
+    async def get_unread_messages_count(self):
+        return await sync_to_async(counters.get_unread_total)(self.user)
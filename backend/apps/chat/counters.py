@@ -0,0 +1,94 @@
+from django.core.cache import cache
+
+from apps.api.models import User
+from apps.chat import services
+
+# счётчики непрочитанных сообщений в Redis; при отсутствии ключа значение
+# считается из БД, дрейф исправляет reconcile_unread_counters
+COUNTER_TIMEOUT = 60 * 60 * 24
+
+
+def chat_counter_key(user_id, chat_id) -> str:
+    return f"unread_chat_{user_id}_{chat_id}"
+
+
+def total_counter_key(user_id) -> str:
+    return f"unread_messages_{user_id}"
+
+
+def increment_unread(user_ids, chat_id):
+    """Новое сообщение: +1 к уже посчитанным счётчикам получателей."""
+    for user_id in user_ids:
+        for key in (chat_counter_key(user_id, chat_id), total_counter_key(user_id)):
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass
+
+
+def reset_unread(user_id, chat_id=None):
+    """Прочтение, вступление или выход: счётчики пересчитаются при запросе."""
+    keys = [total_counter_key(user_id)]
+    if chat_id is not None:
+        keys.append(chat_counter_key(user_id, chat_id))
+    cache.delete_many(keys)
+
+
+def set_unread_counts(user_id, counts: dict[int, int]):
+    cache.set_many(
+        {chat_counter_key(user_id, chat_id): n for chat_id, n in counts.items()},
+        COUNTER_TIMEOUT,
+    )
+    cache.set(total_counter_key(user_id), sum(counts.values()), COUNTER_TIMEOUT)
+
+
+def get_unread_counts(user: User) -> dict[int, int]:
+    """{chat_id: непрочитанные} по всем чатам пользователя."""
+    chat_ids = list(services.get_user_chat_events(user).values_list("id", flat=True))
+    keys = {chat_counter_key(user.pk, chat_id): chat_id for chat_id in chat_ids}
+    counts = {keys[key]: n for key, n in cache.get_many(keys).items()}
+
+    missing = [chat_id for chat_id in chat_ids if chat_id not in counts]
+    if missing:
+        fresh = services.get_unread_counts(user, missing)
+        fresh = {chat_id: fresh.get(chat_id, 0) for chat_id in missing}
+        cache.set_many(
+            {chat_counter_key(user.pk, chat_id): n for chat_id, n in fresh.items()},
+            COUNTER_TIMEOUT,
+        )
+        counts.update(fresh)
+    return counts
+
+
+def get_unread_count(user: User, chat_id) -> int:
+    key = chat_counter_key(user.pk, chat_id)
+    unread = cache.get(key)
+    if unread is None:
+        unread = services.get_unread_count(user, chat_id)
+        cache.add(key, unread, COUNTER_TIMEOUT)
+    return unread
+
+
+def get_chat_unread_counts(chat_id, user_ids) -> dict[int, int]:
+    """{user_id: непрочитанные} в чате для получателей сообщения."""
+    keys = {chat_counter_key(user_id, chat_id): user_id for user_id in user_ids}
+    counts = {keys[key]: n for key, n in cache.get_many(keys).items()}
+
+    missing = [user_id for user_id in user_ids if user_id not in counts]
+    if missing:
+        fresh = services.get_chat_unread_counts(chat_id, missing)
+        fresh = {user_id: fresh.get(user_id, 0) for user_id in missing}
+        cache.set_many(
+            {chat_counter_key(user_id, chat_id): n for user_id, n in fresh.items()},
+            COUNTER_TIMEOUT,
+        )
+        counts.update(fresh)
+    return counts
+
+
+def get_unread_total(user: User) -> int:
+    total = cache.get(total_counter_key(user.pk))
+    if total is None:
+        total = sum(get_unread_counts(user).values())
+        cache.add(total_counter_key(user.pk), total, COUNTER_TIMEOUT)
+    return total
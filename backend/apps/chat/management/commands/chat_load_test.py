@@ -0,0 +1,179 @@
+import asyncio
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import DEFAULT_CHANNEL_LAYER, InMemoryChannelLayer, channel_layers
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import localtime, timedelta
+
+from apps.admin_history.models import HistoryLog
+from apps.api.models import Event, EventParticipant, User
+from apps.chat.consumers import ChatConsumer
+from apps.chat.models import Chat
+from apps.chat.payloads import chat_title_key, sender_card_key
+from apps.notifications.counters import notify_counter_key
+
+TEXT_PREFIX = "load-test"
+
+
+def percentile(values, p):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный тест ChatConsumer: N одновременных WebSocket-клиентов "
+        "в чате синтетического события, по умолчанию на слое каналов в памяти. "
+        "Событие, пользователи и всё, что они создали, удаляются в конце"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=50)
+        parser.add_argument("--senders", type=int, default=5)
+        parser.add_argument(
+            "--messages", type=int, default=10, help="Сообщений от каждого"
+        )
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument(
+            "--redis",
+            action="store_true",
+            help="Использовать настроенный слой каналов вместо слоя в памяти",
+        )
+
+    def handle(self, *args, **options):
+        if options["senders"] > options["clients"]:
+            raise CommandError("Отправителей больше, чем клиентов")
+
+        if not options["redis"]:
+            channel_layers.set(DEFAULT_CHANNEL_LAYER, InMemoryChannelLayer())
+
+        # consumer работает через database_sync_to_async, который закрывает
+        # соединение внутри транзакции, поэтому данные не откатываются,
+        # а удаляются явно
+        event, users = self.create_dataset(options["clients"])
+        try:
+            report = async_to_sync(self.run)(event, users, options)
+        finally:
+            self.drop_dataset(event, users)
+        self.stdout.write(self.style.SUCCESS(report))
+
+    def create_dataset(self, clients):
+        run_id = time.time_ns() % 1000
+        # bulk_create не вызывает сигналы: ни уведомлений, ни индексации
+        users = User.objects.bulk_create(
+            User(
+                phone_number=f"+7000{run_id:03d}{i:04d}",
+                password="!",
+                first_name=TEXT_PREFIX,
+            )
+            for i in range(clients)
+        )
+        # событие в прошлом: при удалении не запускается возврат оплаты
+        start = localtime() - timedelta(days=1)
+        end = start + timedelta(hours=1)
+        [event] = Event.objects.bulk_create(
+            [
+                Event(
+                    title=TEXT_PREFIX,
+                    short_description=TEXT_PREFIX,
+                    description=TEXT_PREFIX,
+                    is_close_event=True,
+                    is_draft=True,
+                    date=start.date(),
+                    start_time=start.time(),
+                    end_time=end.time(),
+                    start_datetime=start,
+                    end_datetime=end,
+                    participants_total=clients,
+                )
+            ]
+        )
+        Chat.objects.create(event=event)
+        EventParticipant.objects.bulk_create(
+            EventParticipant(event=event, user=user) for user in users
+        )
+        return event, users
+
+    def drop_dataset(self, event, users):
+        user_ids = [user.pk for user in users]
+        HistoryLog.objects.filter(user_id__in=user_ids).delete()
+        # участники удаляются до события: сигнал выхода пишет сообщения
+        # в чат, которые должны попасть в каскадное удаление события
+        for participant in EventParticipant.objects.filter(event=event):
+            participant.delete()
+        event.delete()
+        User.all_objects.filter(pk__in=user_ids).delete()
+        cache.delete_many(
+            [chat_title_key(event.pk)]
+            + [notify_counter_key(user_id) for user_id in user_ids]
+            + [sender_card_key(user_id) for user_id in user_ids]
+        )
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/chat/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        if not connected:
+            raise CommandError(f"Клиент {user.pk} не подключился")
+        # счётчики непрочитанных, отправляемые при подключении
+        for _ in range(2):
+            await communicator.receive_json_from()
+        return communicator
+
+    async def receive(self, communicator, expected, sent_at, latencies, timeout):
+        received = 0
+        while received < expected:
+            data = await communicator.receive_json_from(timeout=timeout)
+            if data.get("type") != "chat_message":
+                continue
+            text = data["message"]["text"]
+            if text in sent_at:
+                latencies.append(time.perf_counter() - sent_at[text])
+                received += 1
+
+    async def run(self, event, users, options):
+        start = time.perf_counter()
+        communicators = await asyncio.gather(*(self.connect(u) for u in users))
+        connect_time = time.perf_counter() - start
+
+        senders = communicators[: options["senders"]]
+        expected = len(senders) * options["messages"]
+        sent_at, latencies = {}, []
+        receivers = [
+            asyncio.create_task(
+                self.receive(c, expected, sent_at, latencies, options["timeout"])
+            )
+            for c in communicators
+        ]
+
+        start = time.perf_counter()
+        for i in range(options["messages"]):
+            for n, communicator in enumerate(senders):
+                text = f"{TEXT_PREFIX} {n}-{i}"
+                sent_at[text] = time.perf_counter()
+                await communicator.send_json_to(
+                    {
+                        "type": "chat_message",
+                        "message": {"event_id": event.pk, "text": text},
+                    }
+                )
+        try:
+            await asyncio.gather(*receivers)
+        finally:
+            duration = time.perf_counter() - start
+            await asyncio.gather(*(c.disconnect() for c in communicators))
+
+        ms = [latency * 1000 for latency in latencies]
+        return (
+            f"Клиентов: {len(communicators)}, подключение за {connect_time:.2f} с\n"
+            f"Сообщений: {expected}, доставок: {len(ms)} за {duration:.2f} с "
+            f"({len(ms) / duration:.0f}/с)\n"
+            f"Задержка, мс: p50={statistics.median(ms):.1f} "
+            f"p95={percentile(ms, 95):.1f} max={max(ms):.1f}"
+        )
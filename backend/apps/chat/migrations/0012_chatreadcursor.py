@@ -0,0 +1,124 @@
+# Generated by Django 5.1 on 2026-10-18 15:45
+
+from itertools import islice
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def backfill_read_cursors(apps, schema_editor):
+    """
+    Отметка прочтения - последнее сообщение другого участника, которое
+    пользователь прочитал. Информационные и свои сообщения отмечались
+    прочитанными автоматически и не учитываются.
+    """
+    ReadMessage = apps.get_model("chat", "ReadMessage")
+    ChatReadCursor = apps.get_model("chat", "ChatReadCursor")
+
+    reads = (
+        ReadMessage.objects.filter(message__is_info=False)
+        .exclude(message__sender=F("user"))
+        .values("message__chat_id", "user_id")
+        .annotate(
+            last_read_message_id=Max("message_id"), last_read_at=Max("message__sent_at")
+        )
+        .order_by()
+    )
+    cursors = (
+        ChatReadCursor(
+            chat_id=read["message__chat_id"],
+            user_id=read["user_id"],
+            last_read_message_id=read["last_read_message_id"],
+            last_read_at=read["last_read_at"],
+        )
+        for read in reads.iterator()
+    )
+    while batch := list(islice(cursors, 1000)):
+        ChatReadCursor.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0011_alter_message_is_info"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatReadCursor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_read_message_id",
+                    models.BigIntegerField(
+                        default=0, verbose_name="Последнее прочитанное сообщение"
+                    ),
+                ),
+                (
+                    "last_read_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Время прочтения"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Отметка прочтения",
+                "verbose_name_plural": "Отметки прочтения",
+            },
+        ),
+        migrations.AddField(
+            model_name="chatreadcursor",
+            name="chat",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="read_cursors",
+                to="chat.chat",
+                verbose_name="Чат",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatreadcursor",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="chat_read_cursors",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="chatreadcursor",
+            unique_together={("chat", "user")},
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(fields=["chat", "id"], name="chat_message_chat_id_idx"),
+        ),
+        migrations.RunPython(backfill_read_cursors, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="readmessage",
+            unique_together=None,
+        ),
+        migrations.RemoveField(
+            model_name="readmessage",
+            name="message",
+        ),
+        migrations.RemoveField(
+            model_name="readmessage",
+            name="user",
+        ),
+        migrations.DeleteModel(
+            name="ReadMessage",
+        ),
+    ]
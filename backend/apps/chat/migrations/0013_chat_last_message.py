@@ -0,0 +1,60 @@
+# Generated by Django 5.1 on 2026-10-18 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_last_message(apps, schema_editor):
+    Chat = apps.get_model("chat", "Chat")
+    Message = apps.get_model("chat", "Message")
+
+    messages = Message.objects.filter(chat_id=OuterRef("pk")).order_by("-id")
+    Chat.objects.update(
+        last_message_id=Subquery(messages.values("id")[:1]),
+        last_message_at=Subquery(messages.values("sent_at")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0096_event_search_trgm_indexes"),
+        ("chat", "0012_chatreadcursor"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chat",
+            name="last_message",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="chat.message",
+                verbose_name="Последнее сообщение",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chat",
+            name="last_message_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Время последнего сообщения",
+            ),
+        ),
+        migrations.RunPython(backfill_last_message, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="chat",
+            index=models.Index(
+                models.OrderBy(
+                    models.F("last_message_at"), descending=True, nulls_last=True
+                ),
+                name="chat_last_message_at_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1 on 2026-10-18 15:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0013_chat_last_message"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["chat", "sent_at", "id"], name="chat_message_chat_sent_idx"
+            ),
+        ),
+    ]
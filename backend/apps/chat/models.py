@@ -1,10 +1,21 @@
 from django.db import models
+from django.utils.timezone import localtime
 from django.utils.translation import gettext_lazy as _
 
 from apps.api.models import Event, User
 from core.utils.short_text import short_text
 
 
+class ChatQuerySet(models.QuerySet):
+    def refresh_last_message(self):
+        """Пересчёт последнего сообщения, например после удаления."""
+        messages = Message.objects.filter(chat_id=models.OuterRef("pk")).order_by("-id")
+        return self.update(
+            last_message_id=models.Subquery(messages.values("id")[:1]),
+            last_message_at=models.Subquery(messages.values("sent_at")[:1]),
+        )
+
+
 class Chat(models.Model):
     event = models.OneToOneField(
         Event,
@@ -13,10 +24,31 @@ class Chat(models.Model):
         related_name="chat",
         on_delete=models.CASCADE,
     )
+    # денормализация для сортировки списка чатов и превью без доп. запросов
+    last_message = models.ForeignKey(
+        verbose_name=_("Последнее сообщение"),
+        to="Message",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    last_message_at = models.DateTimeField(
+        _("Время последнего сообщения"), null=True, blank=True, editable=False
+    )
+
+    objects = ChatQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Чат"
         verbose_name_plural = "Чаты"
+        indexes = [
+            models.Index(
+                models.F("last_message_at").desc(nulls_last=True),
+                name="chat_last_message_at_idx",
+            )
+        ]
         history_fields = {"organizer_user": "Организатор"}
 
     def __str__(self) -> str:
@@ -58,11 +90,28 @@ class Message(models.Model):
         verbose_name_plural = "Сообщения"
         get_latest_by = "sent_at"
         ordering = ["sent_at"]
+        indexes = [
+            models.Index(fields=["chat", "id"], name="chat_message_chat_id_idx"),
+            models.Index(
+                fields=["chat", "sent_at", "id"], name="chat_message_chat_sent_idx"
+            ),
+        ]
         history_fields = {"sender_user": "Отправитель", "event_str": "Событие"}
 
     def __str__(self):
         return short_text(self.text, 50)
 
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        super().save(*args, **kwargs)
+        if created and self.chat_id is not None:
+            # условие по id защищает от перезаписи более новым сообщением
+            Chat.objects.filter(
+                models.Q(last_message_id__isnull=True)
+                | models.Q(last_message_id__lt=self.pk),
+                pk=self.chat_id,
+            ).update(last_message_id=self.pk, last_message_at=self.sent_at)
+
     @property
     def event_str(self):
         event = self.chat.event
@@ -70,16 +119,13 @@ class Message(models.Model):
             return "-"
         return f"{event.pk}. {event.title}"
 
-    def save(self, *args, **kwargs) -> None:
-        super().save(*args, **kwargs)
-        _, created = ReadMessage.objects.get_or_create(message=self, user=self.sender)
-        if created:
-            from apps.chat.utils import send_ws_unread_messages
-
-            send_ws_unread_messages(self.sender)
-
     def is_read_by(self, user):
-        return ReadMessage.objects.filter(message=self, user=user).exists()
+        # свои и информационные сообщения считаются прочитанными
+        if self.is_info or self.sender_id == user.pk:
+            return True
+        return ChatReadCursor.objects.filter(
+            chat_id=self.chat_id, user=user, last_read_message_id__gte=self.pk
+        ).exists()
 
     @property
     def sender_user(self):
@@ -89,9 +135,53 @@ class Message(models.Model):
         )
 
 
-class ReadMessage(models.Model):
-    message = models.ForeignKey(Message, related_name="read", on_delete=models.CASCADE)
-    user = models.ForeignKey(User, related_name="read", on_delete=models.CASCADE)
+class ChatReadCursorQuerySet(models.QuerySet):
+    def advance(self, chat_id, user: User, message_id) -> bool:
+        """Сдвиг отметки прочтения вперёд; True, если она изменилась."""
+        self.bulk_create(
+            [self.model(chat_id=chat_id, user=user)], ignore_conflicts=True
+        )
+        updated = self.filter(
+            chat_id=chat_id, user=user, last_read_message_id__lt=message_id
+        ).update(last_read_message_id=message_id, last_read_at=localtime())
+        return updated > 0
+
+    async def aadvance(self, chat_id, user: User, message_id) -> bool:
+        await self.abulk_create(
+            [self.model(chat_id=chat_id, user=user)], ignore_conflicts=True
+        )
+        updated = await self.filter(
+            chat_id=chat_id, user=user, last_read_message_id__lt=message_id
+        ).aupdate(last_read_message_id=message_id, last_read_at=localtime())
+        return updated > 0
+
+
+class ChatReadCursor(models.Model):
+    """
+    Отметка прочтения: все сообщения чата с id не больше
+    last_read_message_id считаются прочитанными пользователем.
+    """
+
+    chat = models.ForeignKey(
+        verbose_name=_("Чат"),
+        to=Chat,
+        on_delete=models.CASCADE,
+        related_name="read_cursors",
+    )
+    user = models.ForeignKey(
+        verbose_name=_("Пользователь"),
+        to=User,
+        on_delete=models.CASCADE,
+        related_name="chat_read_cursors",
+    )
+    last_read_message_id = models.BigIntegerField(
+        _("Последнее прочитанное сообщение"), default=0
+    )
+    last_read_at = models.DateTimeField(_("Время прочтения"), null=True, blank=True)
+
+    objects = ChatReadCursorQuerySet.as_manager()
 
     class Meta:
-        unique_together = ("message", "user")
+        verbose_name = "Отметка прочтения"
+        verbose_name_plural = "Отметки прочтения"
+        unique_together = ("chat", "user")
@@ -0,0 +1,76 @@
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.fields import DateTimeField
+
+from apps.api.models import User
+from apps.chat.models import Message
+
+# сообщение для рассылки кодируется в JSON один раз на стороне отправителя,
+# consumer только дописывает поля получателя; карточка отправителя
+# и название события кэшируются и сбрасываются сигналами
+PAYLOAD_CACHE_TIMEOUT = 60 * 60
+
+_sent_at_field = DateTimeField()
+
+
+def sender_card_key(user_id) -> str:
+    return f"chat_sender_{user_id}"
+
+
+def chat_title_key(chat_id) -> str:
+    return f"chat_title_{chat_id}"
+
+
+def get_sender_card(user: User) -> dict:
+    """Карточка отправителя в формате SenderSerializer (адрес аватара без хоста)."""
+    key = sender_card_key(user.pk)
+    card = cache.get(key)
+    if card is None:
+        card = {
+            "id": user.pk,
+            "avatar": user.avatar.url if user.avatar else None,
+            "name_and_surname": user.get_full_name(),
+        }
+        cache.set(key, card, PAYLOAD_CACHE_TIMEOUT)
+    return card
+
+
+def get_chat_title(message: Message) -> str:
+    key = chat_title_key(message.chat_id)
+    title = cache.get(key)
+    if title is None:
+        title = message.chat.event.title
+        cache.set(key, title, PAYLOAD_CACHE_TIMEOUT)
+    return title
+
+
+def build_message_payload(message: Message, host=None) -> str:
+    """JSON сообщения в формате MessageSerializer без полей получателя."""
+    sender = get_sender_card(message.sender)
+    if sender["avatar"] is not None:
+        # как CustomFileField без запроса в контексте
+        sender = {
+            **sender,
+            "avatar": f"http://{host or settings.MAIN_HOST}{sender['avatar']}",
+        }
+    return orjson.dumps(
+        {
+            "id": message.pk,
+            "chat": message.chat_id,
+            "event_name": get_chat_title(message),
+            "sender": sender,
+            "text": message.text,
+            "sent_at": _sent_at_field.to_representation(message.sent_at),
+            "is_info": message.is_info,
+            "is_incoming": message.is_incoming,
+        }
+    ).decode()
+
+
+def render_message(payload: str, **fields) -> str:
+    """Событие chat_message для получателя: общий JSON плюс его поля."""
+    if not fields:
+        return '{"type":"chat_message","message":%s}' % payload
+    extra = orjson.dumps(fields).decode()
+    return '{"type":"chat_message","message":%s,%s}' % (payload[:-1], extra[1:])
@@ -1,9 +1,9 @@
 from rest_framework import serializers
-from django.db.models import Q
 from django.utils.timezone import localtime
 
 from apps.api.models import Event, User
-from apps.chat.models import Message
+from apps.chat.models import Chat, Message
+from apps.chat.counters import get_unread_count
 from core.serializers import CustomFileField
 
 
@@ -13,6 +13,7 @@ class ChatListSerializer(serializers.ModelSerializer):
     unread_messages = serializers.SerializerMethodField()
     am_i_organizer = serializers.SerializerMethodField()
     total_will_come = serializers.SerializerMethodField()
+    last_message = serializers.SerializerMethodField()
 
     class Meta:
         model = Event
@@ -26,6 +27,7 @@ class ChatListSerializer(serializers.ModelSerializer):
             "unread_messages",
             "am_i_organizer",
             "total_will_come",
+            "last_message",
         ]
         extra_kwargs = {"cover": {"source": "cover_medium"}}
 
@@ -34,16 +36,27 @@ class ChatListSerializer(serializers.ModelSerializer):
         return f"{obj.city.name}, {address}"
 
     def get_unread_messages(self, obj: Event):
-        user = self.context["user"]
-        unread_messages = obj.chat.messages.filter(~Q(read__user=user))
-        return unread_messages.count()
+        # для списка счётчики собираются одним запросом во view
+        unread_counts = self.context.get("unread_counts")
+        if unread_counts is not None:
+            return unread_counts.get(obj.pk, 0)
+        return get_unread_count(self.context["user"], obj.pk)
 
     def get_am_i_organizer(self, obj: Event):
-        organizer = obj.participants.get(is_organizer=True).user
-        return organizer == self.context["user"]
+        organizer = obj.organizer
+        return organizer is not None and organizer.pk == self.context["user"].pk
 
     def get_total_will_come(self, obj: Event):
-        return obj.participants.count()
+        return obj.participants_total
+
+    def get_last_message(self, obj: Event):
+        try:
+            message = obj.chat.last_message
+        except Chat.DoesNotExist:
+            return None
+        if message is None:
+            return None
+        return LastMessageSerializer(message, context=self.context).data
 
 
 class ChatEventSerializer(serializers.ModelSerializer):
@@ -62,7 +75,7 @@ class ChatEventSerializer(serializers.ModelSerializer):
         extra_kwargs = {"cover": {"source": "cover_medium"}}
 
     def get_total_will_come(self, obj: Event):
-        return obj.participants.count()
+        return obj.participants_total
 
     def get_am_i_organizer(self, obj: Event):
         organizer = obj.participants.get(is_organizer=True).user
@@ -85,6 +98,25 @@ class SenderSerializer(serializers.ModelSerializer):
         return obj.get_full_name()
 
 
+class LastMessageSerializer(serializers.ModelSerializer):
+    sender = SenderSerializer()
+    is_mine = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Message
+        fields = [
+            "id",
+            "sender",
+            "text",
+            "sent_at",
+            "is_info",
+            "is_mine",
+        ]
+
+    def get_is_mine(self, obj: Message):
+        return obj.sender_id == self.context["user"].pk
+
+
 class MessageSerializer(serializers.ModelSerializer):
     event_name = serializers.CharField(source="chat.event.title")
     sender = SenderSerializer()
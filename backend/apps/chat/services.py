@@ -0,0 +1,88 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.api.models import Event, User
+from apps.chat.models import ChatReadCursor, Message
+
+
+def get_user_chat_events(user: User):
+    """События, в чатах которых состоит пользователь."""
+    return (
+        Event.objects.filter_participant(user)
+        .filter(is_draft=False, is_active=True)
+        .filter_not_expired()
+        .distinct()
+    )
+
+
+def get_last_read_subquery(user: User):
+    cursor = ChatReadCursor.objects.filter(chat_id=OuterRef("chat_id"), user=user)
+    return Coalesce(Subquery(cursor.values("last_read_message_id")[:1]), 0)
+
+
+def get_unread_messages(user: User, chat_id):
+    return Message.objects.filter(
+        chat_id=chat_id, is_info=False, id__gt=get_last_read_subquery(user)
+    ).exclude(sender=user)
+
+
+def get_unread_messages_query(user: User, chat_ids=None):
+    """
+    Количество непрочитанных сообщений по чатам одним запросом
+    с группировкой по chat_id: сообщения других участников после
+    отметки прочтения пользователя.
+    """
+    messages = Message.objects.filter(
+        chat__event__is_draft=False, chat__event__is_active=True
+    )
+    if chat_ids is None:
+        messages = messages.filter(chat_id__in=get_user_chat_events(user).values("id"))
+    else:
+        messages = messages.filter(chat_id__in=chat_ids)
+
+    return (
+        messages.filter(is_info=False, id__gt=get_last_read_subquery(user))
+        .exclude(sender=user)
+        .order_by()
+        .values("chat_id")
+        .annotate(unread=Count("id"))
+        .values_list("chat_id", "unread")
+    )
+
+
+def get_unread_counts(user: User, chat_ids=None) -> dict[int, int]:
+    """{chat_id: непрочитанные} по всем чатам пользователя или по chat_ids."""
+    return dict(get_unread_messages_query(user, chat_ids))
+
+
+async def aget_unread_counts(user: User, chat_ids=None) -> dict[int, int]:
+    return {
+        chat_id: unread
+        async for chat_id, unread in get_unread_messages_query(user, chat_ids)
+    }
+
+
+def get_unread_count(user: User, chat_id) -> int:
+    return get_unread_counts(user, [chat_id]).get(chat_id, 0)
+
+
+def get_chat_unread_counts(chat_id, user_ids) -> dict[int, int]:
+    """{user_id: непрочитанные} в одном чате для нескольких пользователей."""
+    cursor = ChatReadCursor.objects.filter(
+        chat_id=chat_id, user_id=OuterRef(OuterRef("pk"))
+    ).values("last_read_message_id")[:1]
+    unread = (
+        Message.objects.filter(
+            chat_id=chat_id, is_info=False, id__gt=Coalesce(Subquery(cursor), 0)
+        )
+        .exclude(sender_id=OuterRef("pk"))
+        .order_by()
+        .values("chat_id")
+        .annotate(unread=Count("id"))
+        .values("unread")
+    )
+    return dict(
+        User.objects.filter(pk__in=user_ids)
+        .annotate(unread=Coalesce(Subquery(unread), 0))
+        .values_list("pk", "unread")
+    )
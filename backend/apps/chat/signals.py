@@ -1,9 +1,12 @@
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models.signals import post_save, pre_delete, post_delete
 from django.dispatch import receiver
 
 from apps.api.models import Event, EventParticipant, User, EventAdminProxy
+from apps.chat import counters
 from apps.chat.models import Message, Chat
-from apps.chat.serializers import MessageSerializer
+from apps.chat.payloads import chat_title_key, sender_card_key
 from apps.chat.utils import (
     send_ws_message,
     # add_user_to_group,
@@ -22,13 +25,7 @@ def send_info_message(instance: EventParticipant, join: bool):
         is_info=True,
         is_incoming=join,
     )
-    message_serializer = MessageSerializer(
-        instance=message, context={"user": instance.user}
-    )
-    event_pk = instance.event.id
-    send_ws_message(message_serializer.data, event_pk)
-    for participant in instance.event.participants.all():
-        message.read.get_or_create(user=participant.user)
+    send_ws_message(message)
 
     if join:
         GroupNotification.objects.create(
@@ -56,6 +53,48 @@ def send_leave_message(sender, instance: EventParticipant, **kwargs):
     remove_user_from_group(instance.event)
 
 
+@receiver(post_save, sender=Message)
+def increment_unread_counters(sender, instance: Message, created: bool, **kwargs):
+    if not created or instance.is_info:
+        return
+
+    recipients = (
+        EventParticipant.objects.filter(event_id=instance.chat_id)
+        .exclude(user_id=instance.sender_id)
+        .values_list("user_id", flat=True)
+    )
+    transaction.on_commit(
+        lambda: counters.increment_unread(list(recipients), instance.chat_id)
+    )
+
+
+@receiver(post_delete, sender=Message)
+def refresh_chat_last_message(sender, instance: Message, **kwargs):
+    # ссылка на удалённое сообщение уже обнулена через SET_NULL
+    Chat.objects.filter(
+        pk=instance.chat_id, last_message__isnull=True
+    ).refresh_last_message()
+
+
+@receiver(post_save, sender=EventParticipant)
+@receiver(post_delete, sender=EventParticipant)
+def reset_unread_counters(sender, instance: EventParticipant, **kwargs):
+    transaction.on_commit(
+        lambda: counters.reset_unread(instance.user_id, instance.event_id)
+    )
+
+
+@receiver(post_save, sender=User)
+def reset_sender_card(sender, instance: User, **kwargs):
+    cache.delete(sender_card_key(instance.pk))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=EventAdminProxy)
+def reset_chat_title(sender, instance: Event, **kwargs):
+    cache.delete(chat_title_key(instance.pk))
+
+
 # @receiver(post_save, sender=Event)
 # def create_chat_group(sender, instance: Event, created: bool, **kwargs):
 #     if created:
@@ -0,0 +1,35 @@
+from itertools import islice
+
+from celery import shared_task
+from django.core.cache import cache
+
+from apps.api.models import Event, User
+from apps.chat import counters, services
+
+
+@shared_task
+def reconcile_unread_counters():
+    """Сверка посчитанных в Redis счётчиков сообщений с БД."""
+    events = Event.objects.filter(is_draft=False, is_active=True).filter_not_expired()
+    user_ids = (
+        User.objects.filter(events__event__in=events)
+        .distinct()
+        .values_list("pk", flat=True)
+        .iterator()
+    )
+    fixed = 0
+    while chunk := list(islice(user_ids, 500)):
+        cached = cache.get_many([counters.total_counter_key(pk) for pk in chunk])
+        for user in User.objects.filter(pk__in=chunk):
+            total = cached.get(counters.total_counter_key(user.pk))
+            if total is None:
+                continue
+            chat_ids = list(
+                services.get_user_chat_events(user).values_list("id", flat=True)
+            )
+            fresh = services.get_unread_counts(user, chat_ids)
+            counts = {chat_id: fresh.get(chat_id, 0) for chat_id in chat_ids}
+            if total != sum(counts.values()):
+                counters.set_unread_counts(user.pk, counts)
+                fixed += 1
+    return f"Fixed unread message counters: {fixed}"
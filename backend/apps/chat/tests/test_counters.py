@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.api.tests.factories import create_event, create_user, join
+from apps.chat import counters
+from apps.chat.models import Message
+from apps.chat.tasks import reconcile_unread_counters
+
+
+# задачи, которые сигналы ставят в очередь после коммита
+@mock.patch("apps.api.tasks.sync_search_documents", mock.Mock())
+@mock.patch("apps.notifications.signals.user_notifications_task", mock.Mock())
+class UnreadCountersTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = create_user()
+        self.user = create_user()
+        self.event = create_event(self.organizer)
+        self.participant = join(self.event, self.user)
+
+    def send_message(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Message.objects.create(
+                chat_id=self.event.pk, sender=self.organizer, text="Сообщение"
+            )
+
+    def get_cached(self):
+        return (
+            cache.get(counters.chat_counter_key(self.user.pk, self.event.pk)),
+            cache.get(counters.total_counter_key(self.user.pk)),
+        )
+
+    def test_cold_key_falls_back_to_db(self):
+        self.send_message()
+        self.assertEqual(self.get_cached(), (None, None))
+
+        self.assertEqual(counters.get_unread_count(self.user, self.event.pk), 1)
+        self.assertEqual(counters.get_unread_total(self.user), 1)
+        self.assertEqual(self.get_cached(), (1, 1))
+
+    def test_increment_after_message(self):
+        self.assertEqual(counters.get_unread_total(self.user), 0)
+        self.send_message()
+        self.send_message()
+        self.assertEqual(self.get_cached(), (2, 2))
+        # отправитель своих сообщений не считает
+        self.assertEqual(counters.get_unread_total(self.organizer), 0)
+
+    def test_reset_on_read(self):
+        self.send_message()
+        self.assertEqual(counters.get_unread_total(self.user), 1)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(
+            reverse("chat:message-list", kwargs={"event_pk": self.event.pk}),
+            {"before": ""},
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(counters.get_unread_count(self.user, self.event.pk), 0)
+        self.assertEqual(counters.get_unread_total(self.user), 0)
+
+    def test_reset_on_leave(self):
+        self.send_message()
+        self.assertEqual(counters.get_unread_total(self.user), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participant.delete()
+        self.assertEqual(self.get_cached(), (None, None))
+        self.assertEqual(counters.get_unread_total(self.user), 0)
+
+    def test_reconcile_fixes_drift(self):
+        self.send_message()
+        self.assertEqual(counters.get_unread_total(self.user), 1)
+        cache.set(counters.total_counter_key(self.user.pk), 5)
+        cache.set(counters.chat_counter_key(self.user.pk, self.event.pk), 5)
+
+        self.assertEqual(
+            reconcile_unread_counters(), "Fixed unread message counters: 1"
+        )
+        self.assertEqual(self.get_cached(), (1, 1))
+        self.assertEqual(
+            reconcile_unread_counters(), "Fixed unread message counters: 0"
+        )
@@ -0,0 +1,114 @@
+from django.urls import reverse
+from django.utils.timezone import localtime, timedelta
+from rest_framework.test import APITestCase
+
+from apps.api.tests.factories import create_event, create_user, join
+from apps.chat.models import ChatReadCursor, Message
+
+
+class MessageListKeysetTests(APITestCase):
+    """Постраничный обход истории чата по ключу (sent_at, id)."""
+
+    page_size = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = create_user()
+        cls.user = create_user()
+        cls.event = create_event(cls.organizer)
+        join(cls.event, cls.user)
+        Message.objects.bulk_create(
+            Message(chat_id=cls.event.pk, sender=cls.organizer, text=f"{i}")
+            for i in range(25)
+        )
+        # время отправки не совпадает с порядком id, на одну секунду
+        # приходится несколько сообщений: порядок внутри неё задаёт id
+        base = localtime().replace(microsecond=0)
+        for i, pk in enumerate(
+            Message.objects.filter(chat_id=cls.event.pk).values_list("pk", flat=True)
+        ):
+            Message.objects.filter(pk=pk).update(
+                sent_at=base - timedelta(seconds=i % 5)
+            )
+        cls.expected = list(
+            Message.objects.filter(chat_id=cls.event.pk)
+            .order_by("-sent_at", "-pk")
+            .values_list("pk", flat=True)
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def get_page(self, **params):
+        response = self.client.get(
+            reverse("chat:message-list", kwargs={"event_pk": self.event.pk}),
+            {"page_size": self.page_size, **params},
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def get_ids(self, data):
+        return [message["id"] for message in data["results"]]
+
+    def get_cursor(self):
+        return ChatReadCursor.objects.get(
+            chat_id=self.event.pk, user=self.user
+        ).last_read_message_id
+
+    def test_has_ties(self):
+        sent_at = Message.objects.filter(chat_id=self.event.pk).values_list(
+            "sent_at", flat=True
+        )
+        self.assertLess(len(set(sent_at)), len(sent_at))
+
+    def test_walk_back_and_forth(self):
+        data = self.get_page(before="")
+        self.assertIsNone(data["after"])
+        self.assertIsNone(data["previous"])
+        pages = [self.get_ids(data)]
+        while data["before"] is not None:
+            self.assertIn("before=%s" % data["before"], data["next"])
+            data = self.get_page(before=data["before"])
+            self.assertIsNotNone(data["after"])
+            pages.append(self.get_ids(data))
+
+        self.assertGreater(len(pages), 2)
+        self.assertIsNone(data["next"])
+        self.assertEqual(sum(pages, []), self.expected)
+
+        # обратно к новым: каждая страница тоже от новых к старым
+        back = [self.get_ids(data)]
+        while data["after"] is not None:
+            data = self.get_page(after=data["after"])
+            self.assertIsNotNone(data["before"])
+            back.append(self.get_ids(data))
+        self.assertEqual(sum(reversed(back), []), self.expected)
+        self.assertEqual(back[-1], self.expected[: len(back[-1])])
+
+    def test_after_returns_closest_newer(self):
+        anchor = self.expected[15]
+        data = self.get_page(after=anchor)
+        self.assertEqual(self.get_ids(data), self.expected[5:15])
+        self.assertEqual(data["after"], self.expected[5])
+        self.assertEqual(data["before"], self.expected[14])
+
+    def test_unknown_key(self):
+        response = self.client.get(
+            reverse("chat:message-list", kwargs={"event_pk": self.event.pk}),
+            {"before": 0},
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_read_cursor_advances_to_page(self):
+        older = self.expected[self.page_size : self.page_size * 2]
+        self.get_page(before=self.expected[self.page_size - 1])
+        self.assertEqual(self.get_cursor(), max(older))
+
+        self.get_page(before="")
+        newest = max(self.expected[: self.page_size])
+        cursor = max(newest, max(older))
+        self.assertEqual(self.get_cursor(), cursor)
+
+        # более старая страница не сдвигает отметку назад
+        self.get_page(before=self.expected[-5])
+        self.assertEqual(self.get_cursor(), cursor)
@@ -0,0 +1,29 @@
+import json
+import logging
+import random
+
+from django.conf import settings
+
+logger = logging.getLogger("apps.chat.trace")
+
+
+def trace(event: str, **fields):
+    """
+    Трассировка событий чата. Уровень и доля записываемых событий
+    задаются по типу события в CHAT_TRACE_LEVELS и CHAT_TRACE_SAMPLE_RATES,
+    отброшенные записи не форматируются.
+    """
+    level = settings.CHAT_TRACE_LEVELS.get(event, logging.INFO)
+    if not logger.isEnabledFor(level):
+        return
+
+    rate = settings.CHAT_TRACE_SAMPLE_RATES.get(event, 1.0)
+    if rate < 1 and random.random() >= rate:
+        return
+
+    logger.log(
+        level,
+        "%s %s",
+        event,
+        json.dumps(fields, ensure_ascii=False, default=str),
+    )
@@ -1,26 +1,81 @@
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync, sync_to_async
-from django.db.models import Q
+from django.db import transaction
 
-from apps.api.models import Event
+from apps.api.models import EventParticipant
 from apps.chat.models import Message
+from apps.chat.counters import get_chat_unread_counts, get_unread_total
+from apps.chat.payloads import build_message_payload
+from apps.chat.tracing import trace
 
 channel_layer = get_channel_layer()
 
 
-@async_to_sync
-async def send_ws_message(message, event_pk):
-    await asend_ws_message(message, event_pk, channel_layer)
+def get_chat_participants(event_pk):
+    return EventParticipant.objects.filter(event_id=event_pk).values_list(
+        "user_id", "chat_notifications"
+    )
 
 
-async def asend_ws_message(message: Message, event_pk, _channel_layer):
-    with open("log.txt", "a") as f:
-        f.write(f"Sending message from utils: {message}\n")
+def build_recipients(participants: dict, unread: dict) -> dict[str, dict]:
+    return {
+        str(user_id): {
+            "send_notification": send_notification,
+            "unread": unread[user_id],
+        }
+        for user_id, send_notification in participants.items()
+    }
+
+
+def get_recipients(event_pk) -> dict[str, dict]:
+    """
+    Поля сообщения, зависящие от получателя, для всех участников чата
+    (ключи - строковые id, как их передаёт слой каналов).
+    """
+    participants = dict(get_chat_participants(event_pk))
+    unread = get_chat_unread_counts(event_pk, list(participants))
+    return build_recipients(participants, unread)
+
+
+async def aget_recipients(event_pk) -> dict[str, dict]:
+    participants = {
+        user_id: send_notification
+        async for user_id, send_notification in get_chat_participants(event_pk)
+    }
+    unread = await sync_to_async(get_chat_unread_counts)(event_pk, list(participants))
+    return build_recipients(participants, unread)
+
+
+def send_ws_message(message: Message):
+    """
+    Рассылка после коммита: к этому моменту счётчики непрочитанных
+    уже обновлены, а отменённые сообщения не рассылаются.
+    """
+
+    def send():
+        async_to_sync(asend_ws_message)(
+            message,
+            build_message_payload(message),
+            channel_layer,
+            get_recipients(message.chat_id),
+        )
+
+    transaction.on_commit(send)
+
+
+async def asend_ws_message(
+    message: Message, payload: str, _channel_layer, recipients: dict | None = None
+):
+    trace("message_send", chat=message.chat_id, message=message.pk)
     await _channel_layer.group_send(
-        "chat_%s" % event_pk,
+        "chat_%s" % message.chat_id,
         {
             "type": "chat_message",
-            "message": message,
+            "payload": payload,
+            "chat": message.chat_id,
+            "sender": message.sender_id,
+            "message_id": message.pk,
+            "recipients": recipients or {},
         },
     )
 
@@ -31,21 +86,7 @@ async def send_ws_unread_messages(user):
 
 
 async def asend_ws_unread_messages(user, _channel_layer):
-    events = (
-        Event.objects.filter_participant(user)
-        .filter(is_draft=False, is_active=True)
-        .filter_not_expired()
-        .distinct()
-    )
-
-    unread = sum(
-        [
-            await (await sync_to_async(lambda: event.chat)())
-            .messages.filter(~Q(read__user=user))
-            .acount()
-            async for event in events.aiterator()
-        ]
-    )
+    unread = await sync_to_async(get_unread_total)(user)
 
     await _channel_layer.group_send(
         "user_%s" % user.pk,
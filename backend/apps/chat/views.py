@@ -1,4 +1,4 @@
-from django.db.models import OuterRef, Exists
+from django.db.models import F
 from django.utils.timezone import localtime
 from django.shortcuts import get_object_or_404
 from rest_framework.generics import ListAPIView, CreateAPIView
@@ -19,14 +19,18 @@ from apps.chat.serializers import (
     MessageSerializer,
     MessageSendSerializer,
 )
-from apps.chat.models import Message, Chat, ReadMessage
+from apps.chat.models import ChatReadCursor, Message, Chat
+from apps.chat import counters
+from apps.chat.services import get_unread_messages
 from apps.chat.utils import send_ws_message, send_ws_unread_messages
-from core.pagination import PageNumberSetPagination
+from apps.notifications.counters import get_unread_notify
+from core.pagination import KeysetPagination, OptionalPageNumberPagination
 
 
 class ChatEventViewSet(ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = ChatListSerializer
+    pagination_class = OptionalPageNumberPagination
 
     def get_queryset(self):
         status = self.request.query_params.get("status")
@@ -39,12 +43,11 @@ class ChatEventViewSet(ReadOnlyModelViewSet):
             Event.objects.filter_participant(user)
             .filter(is_draft=False, is_active=True)
             .filter_not_expired()
-            .distinct()
-        )
-        queryset = getattr(queryset, f"filter_{status}")()
-        return sorted(
-            queryset, key=lambda x: x.chat.messages.latest().sent_at, reverse=True
+            .prefetch_list()
+            .select_related("chat__last_message__sender")
+            .order_by(F("chat__last_message_at").desc(nulls_last=True), "-pk")
         )
+        return getattr(queryset, f"filter_{status}")()
 
     def get_object(self):
         return get_object_or_404(
@@ -57,11 +60,13 @@ class ChatEventViewSet(ReadOnlyModelViewSet):
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context["user"] = self.request.user
+        context["unread_counts"] = getattr(self, "unread_counts", None)
         return context
 
     def list(self, request, *args, **kwargs):
+        self.unread_counts = counters.get_unread_counts(request.user)
         chats = super().list(request, *args, **kwargs).data
-        unread_notify = request.user.notifications.filter(read=False).count()
+        unread_notify = get_unread_notify(request.user)
         return Response(
             data={"unread_notify": unread_notify, "chats": chats}, status=HTTP_200_OK
         )
@@ -69,33 +74,40 @@ class ChatEventViewSet(ReadOnlyModelViewSet):
 
 class MessageListView(ListAPIView):
     permission_classes = [IsAuthenticated, IsEventParticipant]
-    pagination_class = PageNumberSetPagination
+    pagination_class = KeysetPagination
     serializer_class = MessageSerializer
 
     def get_queryset(self):
-        queryset = Message.objects.filter(chat__event=self.kwargs["event_pk"]).order_by(
-            "-sent_at"
+        return (
+            Message.objects.filter(chat_id=self.kwargs["event_pk"])
+            .select_related("chat__event", "sender")
+            .order_by("-sent_at", "-id")
         )
-        self.read_all_messages(queryset)
-        return queryset
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context["user"] = self.request.user
         return context
 
-    def read_all_messages(self, messages):
-        user = self.request.user
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self.read_messages(page if page is not None else queryset)
+        return page
 
-        unread_messages_query = messages.annotate(
-            is_read=Exists(
-                ReadMessage.objects.filter(user=user, message_id=OuterRef("pk"))
-            )
-        ).filter(is_read=False)
-        unread_messages = list(unread_messages_query.iterator())
-        ReadMessage.objects.bulk_create(
-            [ReadMessage(user=user, message=message) for message in unread_messages]
+    def read_messages(self, messages):
+        """Отметка прочтения до последнего сообщения отданной страницы."""
+        user = self.request.user
+        chat_id = self.kwargs["event_pk"]
+
+        ids = [message.pk for message in messages]
+        if not ids:
+            return
+        last_message_id = max(ids)
+        unread_messages = list(
+            get_unread_messages(user, chat_id).filter(pk__in=ids).order_by("id")
         )
+        if ChatReadCursor.objects.advance(chat_id, user, last_message_id):
+            counters.reset_unread(user.pk, chat_id)
         send_ws_unread_messages(user)
         HistoryLog.objects.log_actions(
             user_id=user.pk,
@@ -120,11 +132,7 @@ class MessageSendView(CreateAPIView):
 
     def perform_create(self, serializer: MessageSendSerializer):
         message = serializer.save()
-        message_serializer = MessageSerializer(
-            instance=message, context={"user": self.request.user}
-        )
-        event_pk = self.kwargs["event_pk"]
-        send_ws_message(message_serializer.data, event_pk)
+        send_ws_message(message)
         HistoryLog.objects.log_actions(
             user_id=self.request.user.pk,
             queryset=[message],
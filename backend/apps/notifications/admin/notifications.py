@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from apps.admin_history.admin import site
-from apps.notifications.models import GroupNotification, UserNotification
+from apps.notifications.models import EventReminder, GroupNotification, UserNotification
 
 
 class UserNotificationsInline(admin.TabularInline):
@@ -29,3 +29,15 @@ class UserNotificationAdmin(admin.ModelAdmin):
         "body",
         "created_at",
     ]
+
+
+@admin.register(EventReminder, site=site)
+class EventReminderAdmin(admin.ModelAdmin):
+    list_display = [
+        "event",
+        "remind_hours",
+        "due_at",
+        "sent_at",
+    ]
+    list_filter = [("sent_at", admin.EmptyFieldListFilter)]
+    raw_id_fields = ["event"]
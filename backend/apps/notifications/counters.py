@@ -0,0 +1,38 @@
+from django.core.cache import cache
+
+from apps.api.models import User
+
+# счётчик непрочитанных уведомлений в Redis; при отсутствии ключа
+# значение считается из БД, дрейф исправляет reconcile_unread_counters
+COUNTER_TIMEOUT = 60 * 60 * 24
+
+
+def notify_counter_key(user_id) -> str:
+    return f"unread_notify_{user_id}"
+
+
+def increment_unread_notify(user_id):
+    try:
+        cache.incr(notify_counter_key(user_id))
+    except ValueError:
+        pass
+
+
+def reset_unread_notify(user_id):
+    cache.delete(notify_counter_key(user_id))
+
+
+def set_unread_notify_many(counts: dict[int, int]):
+    cache.set_many(
+        {notify_counter_key(user_id): n for user_id, n in counts.items()},
+        COUNTER_TIMEOUT,
+    )
+
+
+def get_unread_notify(user: User) -> int:
+    key = notify_counter_key(user.pk)
+    unread = cache.get(key)
+    if unread is None:
+        unread = user.notifications.filter(read=False).count()
+        cache.add(key, unread, COUNTER_TIMEOUT)
+    return unread
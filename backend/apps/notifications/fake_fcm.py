@@ -0,0 +1,80 @@
+import asyncio
+import json
+import random
+import threading
+import time
+
+import uvicorn
+
+
+class FakeFCMServer:
+    """
+    ASGI-приложение, отвечающее как FCM legacy API (POST /fcm/send),
+    для проверки и замеров отправки пушей без обращения к Google.
+    Токены с префиксом "invalid" получают NotRegistered, с префиксом
+    "unavailable" - Unavailable; error_rate - доля ответов 503.
+    """
+
+    def __init__(self, latency=0.05, error_rate=0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if random.random() < self.error_rate:
+            return await self.respond(send, 503, {"error": "Unavailable"})
+
+        tokens = json.loads(body).get("registration_ids", [])
+        results = [self.get_result(token) for token in tokens]
+        failure = sum("error" in result for result in results)
+        await self.respond(
+            send,
+            200,
+            {
+                "multicast_id": int(time.time() * 1000),
+                "success": len(results) - failure,
+                "failure": failure,
+                "results": results,
+            },
+        )
+
+    @staticmethod
+    def get_result(token: str) -> dict:
+        if token.startswith("invalid"):
+            return {"error": "NotRegistered"}
+        if token.startswith("unavailable"):
+            return {"error": "Unavailable"}
+        return {"message_id": f"0:{token}"}
+
+    @staticmethod
+    async def respond(send, status, data):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": json.dumps(data).encode()})
+
+
+def serve_in_thread(app, host="127.0.0.1", port=8765) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host=host, port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
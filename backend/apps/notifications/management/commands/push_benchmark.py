@@ -0,0 +1,67 @@
+import asyncio
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.notifications.fake_fcm import FakeFCMServer, serve_in_thread
+from apps.notifications.push import FCMSender
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер отправки пушей через FCMSender на локальном фейковом "
+        "сервере FCM (--serve - только запустить сервер)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tokens", type=int, default=10000)
+        parser.add_argument("--texts", type=int, default=1, help="Разных текстов")
+        parser.add_argument("--invalid-rate", type=float, default=0.01)
+        parser.add_argument("--latency", type=float, default=0.05)
+        parser.add_argument("--error-rate", type=float, default=0.05)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--serve", action="store_true")
+
+    def handle(self, *args, **options):
+        app = FakeFCMServer(options["latency"], options["error_rate"])
+        server = serve_in_thread(app, port=options["port"])
+        url = f"http://127.0.0.1:{options['port']}/fcm/send"
+
+        if options["serve"]:
+            self.stdout.write(f"Fake FCM: {url} (FCM_URL), Ctrl+C для выхода")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                server.should_exit = True
+            return
+
+        pushes = [
+            (
+                ("invalid" if random.random() < options["invalid_rate"] else "t")
+                + f"-{i}",
+                "Заголовок",
+                f"Текст {i % options['texts']}",
+            )
+            for i in range(options["tokens"])
+        ]
+        started = time.perf_counter()
+        report = asyncio.run(self.send(url, pushes, options["concurrency"]))
+        elapsed = time.perf_counter() - started
+        server.should_exit = True
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report}. Requests: {app.requests}, "
+                f"{elapsed:.2f}s ({len(pushes) / elapsed:.0f} tokens/s)"
+            )
+        )
+
+    async def send(self, url, pushes, concurrency):
+        sender = FCMSender(url, "fake", concurrency=concurrency, backoff=0.05)
+        try:
+            return await sender.send(pushes)
+        finally:
+            await sender.client.aclose()
@@ -0,0 +1,120 @@
+import random
+import time
+from datetime import date, time as dt_time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.api.models import Category, Event, EventParticipant, Theme, User
+from apps.notifications.models import GroupNotification
+
+
+def legacy_event_added_users(notification: GroupNotification):
+    """Прежний запрос получателей EVENT_ADDED (join по категориям + DISTINCT)."""
+    users = User.objects.filter(is_active=True, is_staff=False, sending_push=True)
+    organizer_user = notification.event.organizer
+    if organizer_user is not None:
+        users = users.exclude(pk=organizer_user.pk)
+    participants = notification.event.participants.all()
+    return (
+        users.filter(categories__in=notification.event.categories.all())
+        .exclude(events__in=participants)
+        .distinct()
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер выборки получателей EVENT_ADDED на синтетических данных. "
+        "Данные создаются в транзакции, которая откатывается в конце"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000_000)
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--user-categories", type=int, default=3)
+        parser.add_argument("--event-categories", type=int, default=3)
+        parser.add_argument("--participants", type=int, default=100)
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--explain", action="store_true")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            notification = self.create_dataset(options)
+            self.measure(
+                "legacy (join + DISTINCT)",
+                legacy_event_added_users(notification).values_list("pk", flat=True),
+                options,
+            )
+            self.measure(
+                "EXISTS",
+                notification.get_users().order_by().values_list("pk", flat=True),
+                options,
+            )
+            transaction.set_rollback(True)
+
+    def create_dataset(self, options) -> GroupNotification:
+        started = time.perf_counter()
+        theme = Theme.objects.create(title=f"benchmark-{time.time_ns()}")
+        categories = Category.objects.bulk_create(
+            Category(title=f"{theme.title}-{i}", theme=theme)
+            for i in range(options["categories"])
+        )
+
+        UserCategory = User.categories.through
+        users = []
+        for offset in range(0, options["users"], options["batch_size"]):
+            count = min(options["batch_size"], options["users"] - offset)
+            batch = User.objects.bulk_create(
+                User(phone_number=f"+7000{offset + i:07d}", password="!")
+                for i in range(count)
+            )
+            UserCategory.objects.bulk_create(
+                UserCategory(user_id=user.pk, category_id=category.pk)
+                for user in batch
+                for category in random.sample(categories, options["user_categories"])
+            )
+            users += random.sample(batch, min(len(batch), options["participants"]))
+
+        # bulk_create не вызывает сигналы индексации и уведомлений
+        [event] = Event.objects.bulk_create(
+            [
+                Event(
+                    title="benchmark",
+                    short_description="benchmark",
+                    description="benchmark",
+                    is_close_event=False,
+                    is_draft=False,
+                    date=date.today(),
+                    start_time=dt_time(12),
+                    end_time=dt_time(13),
+                )
+            ]
+        )
+        event.categories.set(random.sample(categories, options["event_categories"]))
+        participants = random.sample(users, min(len(users), options["participants"]))
+        EventParticipant.objects.bulk_create(
+            EventParticipant(event=event, user=user, is_organizer=i == 0)
+            for i, user in enumerate(participants)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "ANALYZE api_user, api_user_categories, api_eventparticipant"
+            )
+
+        self.stdout.write(
+            f"Dataset: {options['users']} users, {len(categories)} categories "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return GroupNotification(type=GroupNotification.Type.EVENT_ADDED, event=event)
+
+    def measure(self, name, queryset, options):
+        if options["explain"]:
+            self.stdout.write(queryset.explain(analyze=True))
+
+        started = time.perf_counter()
+        count = sum(1 for _ in queryset.iterator(chunk_size=2000))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"{name}: {count} recipients in {elapsed:.2f}s")
+        )
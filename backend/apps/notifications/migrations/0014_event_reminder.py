@@ -0,0 +1,100 @@
+# Generated by Django 5.1 on 2026-10-18 15:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.timezone import localtime, timedelta
+
+
+def move_pending_reminders(apps, schema_editor):
+    """
+    Неотправленные напоминания EVENT_REMIND переносятся в EventReminder.
+    Их задачи с ETA, оставшиеся в очереди, не найдут уведомление
+    и завершатся без рассылки.
+    """
+    GroupNotification = apps.get_model("notifications", "GroupNotification")
+    EventReminder = apps.get_model("notifications", "EventReminder")
+
+    pending = GroupNotification.objects.filter(
+        type="EVENT_REMIND",
+        receivers__isnull=True,
+        event__start_datetime__isnull=False,
+    ).select_related("event")
+    now = localtime()
+    reminders, moved = {}, []
+    for notification in pending.exclude(remind_hours__isnull=True):
+        due_at = notification.event.start_datetime - timedelta(
+            hours=notification.remind_hours
+        )
+        if due_at > now:
+            reminders[notification.event_id, notification.remind_hours] = EventReminder(
+                event_id=notification.event_id,
+                remind_hours=notification.remind_hours,
+                due_at=due_at,
+            )
+            moved.append(notification.pk)
+    EventReminder.objects.bulk_create(reminders.values(), batch_size=1000)
+    GroupNotification.objects.filter(pk__in=moved).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0097_user_categories_category_idx"),
+        ("notifications", "0013_alter_usernotification_created_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventReminder",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "remind_hours",
+                    models.PositiveSmallIntegerField(
+                        verbose_name="Кол-во часов до начала"
+                    ),
+                ),
+                ("due_at", models.DateTimeField(verbose_name="Время отправки")),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Отправлено"
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reminders",
+                        to="api.event",
+                        verbose_name="Событие",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Напоминание о событии",
+                "verbose_name_plural": "Напоминания о событиях",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("sent_at__isnull", True)),
+                        fields=["due_at"],
+                        name="reminder_pending_due_idx",
+                    )
+                ],
+                "unique_together": {("event", "remind_hours")},
+            },
+        ),
+        migrations.RunPython(move_pending_reminders, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="groupnotification",
+            name="task_id",
+        ),
+    ]
@@ -2,3 +2,4 @@
 
 from .notification import GroupNotification, UserNotification
 from .pushtoken import PushToken
+from .reminder import EventReminder, REMIND_HOURS
@@ -1,6 +1,6 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from apps.api.models import User, Event
+from apps.api.models import Event, EventParticipant, User
 from core.utils.short_text import short_text
 
 
@@ -27,7 +27,6 @@ class GroupNotification(models.Model):
     )
     title = models.CharField(_("Заголовок"), max_length=50, null=True)
     body = models.TextField(_("Текст"), max_length=500, null=True)
-    task_id = models.CharField(_("ID задачи"), max_length=255, blank=True, null=True)
     remind_hours = models.PositiveSmallIntegerField(
         _("Кол-во часов до начала"), blank=True, null=True
     )
@@ -39,6 +38,10 @@ class GroupNotification(models.Model):
         verbose_name_plural = "Уведомления"
 
     def get_users(self):
+        """
+        Получатели уведомления. Условия по участию в событии и категориям
+        строятся через EXISTS, без join и DISTINCT по пользователям.
+        """
         users = User.objects.filter(is_active=True, is_staff=False, sending_push=True)
         if self.type == GroupNotification.Type.ADMIN:
             return users
@@ -46,41 +49,46 @@ class GroupNotification(models.Model):
         elif self.type == GroupNotification.Type.EVENT_REC:
             return users.filter(receive_recs=True)
 
-        elif self.type == GroupNotification.Type.EVENT_REMIND:
-            participants = self.event.participants.all()
-            return users.filter(events__in=participants)
-
-        elif self.type == GroupNotification.Type.EVENT_ADDED:
-            categories = self.event.categories.all()
-            organizer_user = self.event.organizer
-
-            if organizer_user is not None:
-                users = users.exclude(pk=organizer_user.pk)
+        elif self.type == GroupNotification.Type.EVENT_REJECT:
+            return users.filter(pk=self.related_id)
 
-            participants = self.event.participants.all()
-            return (
-                users.filter(categories__in=categories)
-                .exclude(events__in=participants)
-                .distinct()
+        participants = EventParticipant.objects.filter(
+            event_id=self.event_id, user_id=models.OuterRef("pk")
+        )
+        if self.type == GroupNotification.Type.EVENT_ADDED:
+            # организатор тоже участник и исключается вместе с остальными
+            event_categories = Event.categories.through.objects.filter(
+                event_id=self.event_id
+            ).values("category_id")
+            user_categories = User.categories.through.objects.filter(
+                user_id=models.OuterRef("pk"), category_id__in=event_categories
+            )
+            return users.filter(
+                models.Exists(user_categories), ~models.Exists(participants)
             )
 
-        elif self.type == GroupNotification.Type.EVENT_CHANGED:
-            participants = self.event.participants.all()
-            return users.filter(events__in=participants)
+        elif self.type in (
+            GroupNotification.Type.EVENT_REMIND,
+            GroupNotification.Type.EVENT_CHANGED,
+        ):
+            return users.filter(models.Exists(participants))
 
         elif self.type == GroupNotification.Type.CHAT_JOIN:
-            participants = self.event.participants.all()
             if self.related_id is not None:
                 users = users.exclude(pk=self.related_id)
-
-            return users.filter(events__in=participants)
-
-        elif self.type == GroupNotification.Type.EVENT_REJECT:
-            return users.filter(pk=self.related_id)
+            return users.filter(models.Exists(participants))
 
         else:
-            participants = self.event.participants.filter(is_organizer=False)
-            return users.filter(events__in=participants)
+            return users.filter(models.Exists(participants.filter(is_organizer=False)))
+
+    def iter_user_ids(self, chunk_size=2000):
+        """Потоковое чтение id получателей без загрузки моделей."""
+        return (
+            self.get_users()
+            .order_by()
+            .values_list("pk", flat=True)
+            .iterator(chunk_size=chunk_size)
+        )
 
     def save(self, *args, **kwargs):
         if self.title is None:
@@ -134,7 +142,7 @@ class UserNotification(models.Model):
             "24": "Напоминаем, что событие уже завтра!",
         }
         body = hours_sample[str(self.notification.remind_hours)]
-        organizer = self.user == self.event.organizer
+        organizer = self.user_id == getattr(self.event.organizer, "pk", None)
         event_remind_sample = "отменить" if organizer else "не пойти на"
         if self.notification.remind_hours > 3:
             body += (
@@ -174,9 +182,13 @@ class UserNotification(models.Model):
         if self.notification.type == GroupNotification.Type.EVENT_REJECT:
             return "Вы отписались от события"
 
-    def save(self, *args, **kwargs):
+    def fill_defaults(self):
+        """Заголовок и текст по умолчанию (в т.ч. перед bulk_create)."""
         if self.title in (None, ""):
             self.title = self.get_title()
         if self.body in (None, ""):
             self.body = self.get_body()
+
+    def save(self, *args, **kwargs):
+        self.fill_defaults()
         return super().save(*args, **kwargs)
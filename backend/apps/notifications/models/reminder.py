@@ -0,0 +1,111 @@
+from django.db import models
+from django.utils.timezone import localtime, timedelta
+from django.utils.translation import gettext_lazy as _
+
+from apps.api.models import Event
+
+# за сколько часов до начала события отправляются напоминания
+REMIND_HOURS = (24, 4, 1, 0)
+
+
+class EventReminderQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(sent_at__isnull=True)
+
+    def claim_due(self, limit: int):
+        """
+        Блокировка наступивших напоминаний (вызывать в транзакции).
+        Строки, занятые другим обработчиком, пропускаются (SKIP LOCKED).
+        """
+        return (
+            self.pending()
+            .filter(due_at__lte=localtime())
+            .select_for_update(skip_locked=True, of=("self",))
+            .select_related("event")
+            .order_by("due_at")[:limit]
+        )
+
+    def schedule(self, event: Event):
+        """
+        Сверка напоминаний события с его временем начала: недостающие
+        строки создаются, сдвинутые обновляются, лишние неотправленные
+        удаляются. Совпадающие по времени строки не затрагиваются.
+        """
+        now = localtime()
+        due = {}
+        if event.start_datetime is not None:
+            for hours in REMIND_HOURS:
+                due_at = event.start_datetime - timedelta(hours=hours)
+                if due_at > now:
+                    due[hours] = due_at
+
+        existing = {
+            reminder.remind_hours: reminder for reminder in self.filter(event=event)
+        }
+        stale = [
+            reminder.pk
+            for hours, reminder in existing.items()
+            if hours not in due and reminder.sent_at is None
+        ]
+        if stale:
+            self.filter(pk__in=stale).delete()
+
+        created, moved = [], []
+        for hours, due_at in due.items():
+            reminder = existing.get(hours)
+            if reminder is None:
+                created.append(
+                    self.model(event=event, remind_hours=hours, due_at=due_at)
+                )
+            elif reminder.due_at != due_at:
+                # событие перенесли: отправленное напоминание отправится снова
+                reminder.due_at = due_at
+                reminder.sent_at = None
+                moved.append(reminder)
+        if created:
+            self.bulk_create(
+                created,
+                update_conflicts=True,
+                unique_fields=["event", "remind_hours"],
+                update_fields=["due_at", "sent_at"],
+            )
+        if moved:
+            self.bulk_update(moved, ["due_at", "sent_at"])
+
+    def cancel(self, event: Event):
+        return self.pending().filter(event=event).delete()
+
+
+class EventReminder(models.Model):
+    """
+    Запланированное напоминание о событии. Наступившие строки раз
+    в минуту забирает задача dispatch_due_reminders и создаёт
+    по ним групповые уведомления EVENT_REMIND.
+    """
+
+    event = models.ForeignKey(
+        verbose_name=_("Событие"),
+        to=Event,
+        on_delete=models.CASCADE,
+        related_name="reminders",
+    )
+    remind_hours = models.PositiveSmallIntegerField(_("Кол-во часов до начала"))
+    due_at = models.DateTimeField(_("Время отправки"))
+    sent_at = models.DateTimeField(_("Отправлено"), null=True, blank=True)
+
+    objects = EventReminderQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Напоминание о событии"
+        verbose_name_plural = "Напоминания о событиях"
+        unique_together = ("event", "remind_hours")
+        indexes = [
+            models.Index(
+                fields=["due_at"],
+                condition=models.Q(sent_at__isnull=True),
+                name="reminder_pending_due_idx",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event}: за {self.remind_hours} ч."
@@ -0,0 +1,231 @@
+import asyncio
+import concurrent.futures
+import logging
+import random
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from importlib.util import find_spec
+from itertools import islice
+
+from django.conf import settings
+from httpx import AsyncClient, HTTPError, Limits, Timeout
+
+from apps.notifications.models import PushToken
+
+logger = logging.getLogger(__name__)
+
+# ограничение FCM на число получателей в одном запросе (registration_ids)
+FCM_MULTICAST_LIMIT = 1000
+# ошибки, после которых токен больше не действителен
+INVALID_TOKEN_ERRORS = {"NotRegistered", "InvalidRegistration", "MismatchSenderId"}
+# ошибки отдельных токенов, которые стоит повторить
+RETRY_TOKEN_ERRORS = {"Unavailable", "InternalServerError"}
+# таймаут одного запроса к FCM, секунды
+HTTP_TIMEOUT = 10
+
+
+@dataclass
+class PushReport:
+    sent: int = 0
+    failed: int = 0
+    invalid_tokens: list[str] = field(default_factory=list)
+
+    def merge(self, other: "PushReport"):
+        self.sent += other.sent
+        self.failed += other.failed
+        self.invalid_tokens += other.invalid_tokens
+
+    def __str__(self):
+        return (
+            f"Sent: {self.sent}, failed: {self.failed}, "
+            f"invalid tokens: {len(self.invalid_tokens)}"
+        )
+
+
+class FCMSender:
+    """
+    Отправка пушей через FCM: один пул соединений (HTTP/2, если
+    установлен h2), multicast-запросы до FCM_MULTICAST_LIMIT токенов,
+    ограничение числа одновременных запросов и повторы с экспоненциальной
+    задержкой при 429/5xx и временных ошибках отдельных токенов.
+    Задержка между повторами не больше max_delay, повторы прекращаются,
+    если не укладываются в timeout секунд с начала отправки.
+    """
+
+    def __init__(
+        self,
+        url,
+        server_key,
+        concurrency=50,
+        max_retries=3,
+        backoff=0.5,
+        max_delay=30,
+        timeout=60,
+    ):
+        self.url = url
+        self.server_key = server_key
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.client = AsyncClient(
+            http2=find_spec("h2") is not None,
+            timeout=Timeout(HTTP_TIMEOUT),
+            limits=Limits(max_connections=concurrency),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"key={server_key}",
+            },
+        )
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    @staticmethod
+    def get_payload(tokens, title, body):
+        return {
+            "registration_ids": tokens,
+            "content_available": True,
+            "priority": "high",
+            "notification": {
+                "title": title,
+                "body": body,
+            },
+            "data": {"click_action": "FLUTTER_NOTIFICATION_CLICK"},
+            "apns": {
+                "payload": {"aps": {"content_available": 1, "mutable-content": 1}}
+            },
+        }
+
+    async def send(self, pushes) -> PushReport:
+        """Отправка [(token, title, body)], токены группируются по тексту."""
+        report = PushReport()
+        groups = defaultdict(list)
+        for token, title, body in pushes:
+            groups[title, body].append(token)
+
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        batches = []
+        for (title, body), tokens in groups.items():
+            tokens = iter(tokens)
+            while batch := list(islice(tokens, FCM_MULTICAST_LIMIT)):
+                batches.append(self.send_batch(batch, title, body, deadline))
+        for batch_report in await asyncio.gather(*batches):
+            report.merge(batch_report)
+        return report
+
+    async def send_batch(self, tokens, title, body, deadline) -> PushReport:
+        report = PushReport()
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self.semaphore:
+                    response = await self.client.post(
+                        self.url, json=self.get_payload(tokens, title, body)
+                    )
+            except HTTPError as e:
+                logger.warning("FCM request failed: %s", e)
+            else:
+                if response.status_code == 429 or response.status_code >= 500:
+                    retry_after = response.headers.get("Retry-After")
+                elif response.status_code != 200:
+                    logger.error(
+                        "FCM error %s: %s", response.status_code, response.text
+                    )
+                    break
+                else:
+                    tokens = self.handle_results(tokens, response.json(), report)
+                    if not tokens:
+                        return report
+
+            if attempt == self.max_retries:
+                break
+            delay = self.get_delay(attempt, retry_after)
+            if asyncio.get_running_loop().time() + delay >= deadline:
+                logger.warning("FCM retries for %s tokens exceed timeout", len(tokens))
+                break
+            await asyncio.sleep(delay)
+
+        report.failed += len(tokens)
+        return report
+
+    def handle_results(self, tokens, data, report: PushReport) -> list[str]:
+        """Учёт ответа FCM, возвращает токены для повтора."""
+        retry = []
+        for token, result in zip(tokens, data.get("results", [])):
+            error = result.get("error")
+            if error is None:
+                report.sent += 1
+            elif error in INVALID_TOKEN_ERRORS:
+                report.invalid_tokens.append(token)
+            elif error in RETRY_TOKEN_ERRORS:
+                retry.append(token)
+            else:
+                report.failed += 1
+        return retry
+
+    def get_delay(self, attempt, retry_after=None) -> float:
+        if retry_after is not None and retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            delay = self.backoff * 2**attempt * (1 + random.random())
+        return min(delay, self.max_delay)
+
+
+class PushWorker:
+    """
+    Фоновый event loop процесса с долгоживущим FCMSender. Celery
+    и синхронный код передают в него отправку и ждут результата,
+    поэтому соединения переиспользуются между задачами.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loop = None
+        self.sender = None
+
+    def start(self):
+        with self.lock:
+            if self.loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True).start()
+            self.sender = asyncio.run_coroutine_threadsafe(
+                self.create_sender(), loop
+            ).result()
+            self.loop = loop
+
+    async def create_sender(self):
+        return FCMSender(
+            settings.FCM_URL,
+            settings.FCM_TOKEN,
+            concurrency=settings.NOTIFICATION_PUSH_CONCURRENCY,
+            max_retries=settings.FCM_MAX_RETRIES,
+            max_delay=settings.FCM_MAX_RETRY_DELAY,
+            timeout=settings.FCM_SEND_TIMEOUT,
+        )
+
+    def send(self, pushes) -> PushReport:
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self.sender.send(pushes), self.loop)
+        try:
+            # запас на последний запрос, начатый до истечения timeout
+            return future.result(self.sender.timeout + HTTP_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logger.error("FCM send of %s pushes timed out", len(pushes))
+            return PushReport(failed=len(pushes))
+
+
+push_worker = PushWorker()
+
+
+def send_pushes(pushes) -> PushReport:
+    """Отправка [(token, title, body)] с удалением недействительных токенов."""
+    pushes = list(pushes)
+    if not pushes:
+        return PushReport()
+    report = push_worker.send(pushes)
+    if report.invalid_tokens:
+        PushToken.objects.filter(token__in=report.invalid_tokens).delete()
+    return report
@@ -7,6 +7,7 @@ from django.utils.timezone import localtime, timedelta
 
 from apps.api.models import Event
 from core.serializers import CustomFileField
+from apps.notifications.counters import get_unread_notify
 from apps.notifications.models import GroupNotification, UserNotification
 
 
@@ -71,4 +72,4 @@ class UserNotificationMessageSerializer(ModelSerializer):
         return UserNotificationSerializer(instance=obj).data if not obj.read else None
 
     def get_unread(self, obj: UserNotification):
-        return obj.user.notifications.filter(read=False).count()
+        return get_unread_notify(obj.user)
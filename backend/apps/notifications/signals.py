@@ -1,20 +1,23 @@
-from django.db.models.signals import post_save, pre_delete, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from django.utils.timezone import timedelta, localtime
-from asgiref.sync import async_to_sync
 
-from config.celery import celery_app
 from apps.api.models import Event, EventParticipant, EventAdminProxy
-from apps.notifications.models import GroupNotification, UserNotification
+from apps.notifications.counters import increment_unread_notify, reset_unread_notify
+from apps.notifications.models import EventReminder, GroupNotification, UserNotification
 from apps.notifications.tasks import (
     user_notifications_task,
-    send_push_notification,
+    send_push_notification_task,
 )
 from apps.notifications.serializers import UserNotificationMessageSerializer
 from apps.notifications.services import send_ws_notification
 from core.utils.old_instance import get_old_instance
 
 
+def send_push_notification(notification: UserNotification):
+    transaction.on_commit(lambda: send_push_notification_task.delay(notification.pk))
+
+
 @receiver([post_save], sender=EventParticipant)
 def send_join_event_notification(
     sender, instance: EventParticipant, created: bool, **kwargs
@@ -35,7 +38,7 @@ def send_join_event_notification(
             title=title,
             body=body,
         )
-        async_to_sync(send_push_notification)(notification)
+        send_push_notification(notification)
 
 
 @receiver([post_save], sender=EventParticipant)
@@ -49,7 +52,7 @@ def send_kick_event_notification(sender, instance: EventParticipant, **kwargs):
             title=title,
             body=body,
         )
-        async_to_sync(send_push_notification)(notification)
+        send_push_notification(notification)
         instance.delete()
 
 
@@ -57,16 +60,24 @@ def send_kick_event_notification(sender, instance: EventParticipant, **kwargs):
 @receiver([post_save], sender=EventAdminProxy)
 def create_event_group_notifications(sender, instance: Event, created: bool, **kwargs):
     is_active = instance.is_active and not instance.is_draft
-    if created and is_active:
-        create_event_remind_notifications(instance)
-    if not created:
-        was_draft = instance.tracker.previous("is_draft")
-        was_active = instance.tracker.previous("is_active") and not was_draft
-        delete_existing_remind_notifications(instance)
+    if created:
         if is_active:
             create_event_remind_notifications(instance)
-        elif was_active:
-            create_event_cancel_notification(instance)
+        return
+
+    was_draft = instance.tracker.previous("is_draft")
+    was_active = instance.tracker.previous("is_active") and not was_draft
+    if is_active and not was_active:
+        create_event_remind_notifications(instance)
+    elif is_active:
+        # обычное редактирование: только то, что затронуто изменениями
+        if instance.tracker.has_changed("is_close_event"):
+            create_event_added_notification(instance)
+        if instance.tracker.has_changed("start_datetime"):
+            EventReminder.objects.schedule(instance)
+    elif was_active:
+        delete_existing_remind_notifications(instance)
+        create_event_cancel_notification(instance)
 
 
 @receiver([pre_save], sender=Event)
@@ -107,12 +118,10 @@ def create_event_change_notification(instance: Event, **kwargs):
 
 
 def delete_existing_remind_notifications(instance: Event):
-    GroupNotification.objects.filter(
-        type=GroupNotification.Type.EVENT_REMIND, event=instance
-    ).delete()
+    EventReminder.objects.cancel(instance)
 
 
-def create_event_remind_notifications(instance: Event):
+def create_event_added_notification(instance: Event):
     GroupNotification.objects.filter(
         type=GroupNotification.Type.EVENT_ADDED, event=instance
     ).delete()
@@ -121,13 +130,10 @@ def create_event_remind_notifications(instance: Event):
             type=GroupNotification.Type.EVENT_ADDED, event=instance
         )
 
-    for hours in [24, 4, 1, 0]:
-        if instance.start_datetime - timedelta(hours=hours) > localtime():
-            GroupNotification.objects.create(
-                type=GroupNotification.Type.EVENT_REMIND,
-                remind_hours=hours,
-                event=instance,
-            )
+
+def create_event_remind_notifications(instance: Event):
+    create_event_added_notification(instance)
+    EventReminder.objects.schedule(instance)
 
 
 def create_event_cancel_notification(instance: Event):
@@ -144,7 +150,7 @@ def create_event_cancel_notification(instance: Event):
             title=instance.title,
             body="Событие заблокировано администрацией",
         )
-        async_to_sync(send_push_notification)(notification)
+        send_push_notification(notification)
 
 
 def create_event_change_notification(instance: Event):
@@ -161,22 +167,24 @@ def create_user_notifications_task(
     sender, instance: GroupNotification, created: bool, **kwargs
 ):
     if created:
-        if instance.type == GroupNotification.Type.EVENT_REMIND:
-            delta = timedelta(hours=instance.remind_hours)
-            task = user_notifications_task.apply_async(
-                eta=instance.event.start_datetime - delta,
-                args=[instance.pk],
-            )
-            instance.task_id = task.id
-            instance.save()
-        else:
-            user_notifications_task.apply_async(args=[instance.pk], countdown=3)
+        transaction.on_commit(
+            lambda: user_notifications_task.apply_async(args=[instance.pk], countdown=3)
+        )
+
+
+@receiver(post_save, sender=UserNotification)
+def update_unread_notify_counter(
+    sender, instance: UserNotification, created: bool, **kwargs
+):
+    if created and not instance.read:
+        increment_unread_notify(instance.user_id)
+    else:
+        reset_unread_notify(instance.user_id)
 
 
-@receiver(pre_delete, sender=GroupNotification)
-def revoke_pending_task(sender, instance: GroupNotification, **kwargs):
-    if instance.type == GroupNotification.Type.EVENT_REMIND:
-        celery_app.control.revoke(task_id=instance.task_id)
+@receiver(post_delete, sender=UserNotification)
+def reset_unread_notify_counter(sender, instance: UserNotification, **kwargs):
+    reset_unread_notify(instance.user_id)
 
 
 @receiver(post_save, sender=UserNotification)
@@ -1,29 +1,156 @@
+import time
+from itertools import islice
+
 from celery import shared_task
 from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, prefetch_related_objects
+from django.utils.timezone import localtime
 
-from apps.api.models import Event
-from apps.notifications.models import GroupNotification, UserNotification, PushToken
-from apps.notifications.services import send_fcm_push
+from apps.api.models import Event, User
+from apps.notifications.counters import (
+    COUNTER_TIMEOUT,
+    notify_counter_key,
+    set_unread_notify_many,
+)
+from apps.notifications.models import (
+    EventReminder,
+    GroupNotification,
+    PushToken,
+    UserNotification,
+)
+from apps.notifications.serializers import UserNotificationSerializer
+from apps.notifications.push import send_pushes
+from apps.notifications.services import asend_ws_notifications, channel_layer
 
 
 @shared_task
 def user_notifications_task(pk):
-    notification = GroupNotification.objects.get(pk=pk)
-    users = notification.get_users()
-    for user in users:
-        user_notification = UserNotification.objects.create(
-            notification=notification,
-            event=notification.event,
-            user=user,
-        )
-        async_to_sync(send_push_notification)(user_notification)
+    """Разбиение получателей на пачки, которые доставляются параллельно."""
+    notification = GroupNotification.objects.filter(pk=pk).first()
+    if notification is None:
+        return f"Notification {pk} was deleted"
+    user_ids = notification.iter_user_ids()
+    total = chunks = 0
+    while chunk := list(islice(user_ids, settings.NOTIFICATION_CHUNK_SIZE)):
+        deliver_notifications_task.delay(pk, chunk)
+        total += len(chunk)
+        chunks += 1
     if notification.type == GroupNotification.Type.EVENT_CANCELED:
         notification.event.participants.filter(is_organizer=False).delete()
+    return f"Notification {pk}: {total} users in {chunks} chunks"
+
+
+@shared_task
+def deliver_notifications_task(pk, user_ids):
+    """
+    Доставка пачки: UserNotification одним bulk_create, счётчики
+    непрочитанных одним запросом, WS-сообщения и пуши параллельно.
+    Сигналы post_save при bulk_create не вызываются, поэтому счётчики
+    и WS-рассылка обновляются здесь.
+    """
+    started = time.perf_counter()
+    notification = (
+        GroupNotification.objects.select_related("event").filter(pk=pk).first()
+    )
+    if notification is None:
+        return f"Notification {pk} was deleted"
+    if notification.event is not None:
+        # организатор для текста напоминаний берётся из участников
+        prefetch_related_objects([notification.event], "participants__user")
 
+    user_notifications = []
+    for user_id in user_ids:
+        user_notification = UserNotification(
+            notification=notification, event=notification.event, user_id=user_id
+        )
+        user_notification.fill_defaults()
+        user_notifications.append(user_notification)
+    UserNotification.objects.bulk_create(user_notifications)
+
+    unread = dict(
+        UserNotification.objects.filter(user_id__in=user_ids, read=False)
+        .order_by()
+        .values("user_id")
+        .annotate(unread=Count("id"))
+        .values_list("user_id", "unread")
+    )
+    set_unread_notify_many({user_id: unread.get(user_id, 0) for user_id in user_ids})
+
+    messages = {
+        n.user_id: {
+            "notification": UserNotificationSerializer(instance=n).data,
+            "unread": unread.get(n.user_id, 0),
+        }
+        for n in user_notifications
+    }
+    by_user = {n.user_id: n for n in user_notifications}
+    pushes = [
+        (token, by_user[user_id].title, by_user[user_id].body)
+        for user_id, token in PushToken.objects.filter(
+            user_id__in=user_ids
+        ).values_list("user_id", "token")
+    ]
+    async_to_sync(asend_ws_notifications)(messages, channel_layer)
+    report = send_pushes(pushes)
 
-async def send_push_notification(notification: UserNotification):
-    async for push_token in PushToken.objects.filter(user=notification.user):
-        await send_fcm_push(push_token.token, notification.title, notification.body)
+    elapsed = time.perf_counter() - started
+    return (
+        f"Notification {pk}: delivered {len(user_notifications)} notifications "
+        f"in {elapsed:.2f}s ({len(user_notifications) / elapsed:.0f}/s). "
+        f"Pushes: {report}"
+    )
+
+
+@shared_task
+def send_push_notification_task(pk):
+    """Пуш по уведомлению пользователя вне запроса, который его создал."""
+    notification = UserNotification.objects.filter(pk=pk).first()
+    if notification is None:
+        return f"Notification {pk} was deleted"
+    tokens = PushToken.objects.filter(user_id=notification.user_id).values_list(
+        "token", flat=True
+    )
+    report = send_pushes(
+        (token, notification.title, notification.body) for token in tokens
+    )
+    return f"Notification {pk}: {report}"
+
+
+@shared_task
+def dispatch_due_reminders():
+    """
+    Отправка наступивших напоминаний пачками. Строки блокируются
+    с SKIP LOCKED, поэтому параллельные запуски не пересекаются.
+    """
+    dispatched = skipped = 0
+    while True:
+        with transaction.atomic():
+            reminders = list(
+                EventReminder.objects.claim_due(settings.REMINDER_BATCH_SIZE)
+            )
+            if not reminders:
+                break
+
+            now = localtime()
+            for reminder in reminders:
+                event = reminder.event
+                # событие уже началось: заранее напоминать поздно
+                if reminder.remind_hours > 0 and event.start_datetime <= now:
+                    skipped += 1
+                    continue
+                GroupNotification.objects.create(
+                    type=GroupNotification.Type.EVENT_REMIND,
+                    remind_hours=reminder.remind_hours,
+                    event=event,
+                )
+                dispatched += 1
+            EventReminder.objects.filter(
+                pk__in=[reminder.pk for reminder in reminders]
+            ).update(sent_at=now)
+    return f"Dispatched reminders: {dispatched}, skipped: {skipped}"
 
 
 @shared_task
@@ -31,3 +158,30 @@ def create_daily_event_notifications():
     event = Event.objects.get_recommended_event()
     GroupNotification.objects.create(event=event, type=GroupNotification.Type.EVENT_REC)
     return f"Notification of type={type} was created"
+
+
+@shared_task
+def reconcile_unread_notify_counters():
+    """Сверка посчитанных в Redis счётчиков уведомлений с БД."""
+    user_ids = User.objects.values_list("pk", flat=True).iterator()
+    fixed = 0
+    while chunk := list(islice(user_ids, 1000)):
+        keys = {notify_counter_key(pk): pk for pk in chunk}
+        cached = {keys[key]: n for key, n in cache.get_many(keys).items()}
+        if not cached:
+            continue
+        actual = dict(
+            UserNotification.objects.filter(user_id__in=cached, read=False)
+            .order_by()
+            .values("user_id")
+            .annotate(unread=Count("id"))
+            .values_list("user_id", "unread")
+        )
+        drifted = {
+            notify_counter_key(pk): actual.get(pk, 0)
+            for pk, n in cached.items()
+            if n != actual.get(pk, 0)
+        }
+        cache.set_many(drifted, COUNTER_TIMEOUT)
+        fixed += len(drifted)
+    return f"Fixed unread notification counters: {fixed}"
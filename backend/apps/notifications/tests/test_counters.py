@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.api.tests.factories import create_user
+from apps.notifications.counters import get_unread_notify, notify_counter_key
+from apps.notifications.models import UserNotification
+from apps.notifications.tasks import reconcile_unread_notify_counters
+
+
+class UnreadNotifyCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+
+    def notify(self):
+        return UserNotification.objects.create(
+            user=self.user, title="Событие", body="Текст"
+        )
+
+    def get_cached(self):
+        return cache.get(notify_counter_key(self.user.pk))
+
+    def test_cold_key_falls_back_to_db(self):
+        self.notify()
+        cache.delete(notify_counter_key(self.user.pk))
+        self.assertEqual(get_unread_notify(self.user), 1)
+        self.assertEqual(self.get_cached(), 1)
+
+    def test_increment_after_notification(self):
+        self.assertEqual(get_unread_notify(self.user), 0)
+        self.notify()
+        self.notify()
+        self.assertEqual(self.get_cached(), 2)
+
+    def test_reset_on_read(self):
+        notification = self.notify()
+        self.assertEqual(get_unread_notify(self.user), 1)
+
+        notification.read = True
+        notification.save()
+        self.assertEqual(get_unread_notify(self.user), 0)
+
+    def test_reconcile_fixes_drift(self):
+        self.notify()
+        self.assertEqual(get_unread_notify(self.user), 1)
+        cache.set(notify_counter_key(self.user.pk), 5)
+
+        self.assertEqual(
+            reconcile_unread_notify_counters(),
+            "Fixed unread notification counters: 1",
+        )
+        self.assertEqual(self.get_cached(), 1)
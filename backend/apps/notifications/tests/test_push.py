@@ -0,0 +1,59 @@
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from httpx import AsyncClient, MockTransport, Response
+
+from apps.api.tests.factories import create_user
+from apps.notifications.models import UserNotification
+from apps.notifications.push import FCMSender
+from apps.notifications.signals import send_push_notification
+
+
+class FCMSenderTests(SimpleTestCase):
+    def create_sender(self, handler, **kwargs):
+        sender = FCMSender("http://fcm.test/send", "key", **kwargs)
+        sender.client = AsyncClient(transport=MockTransport(handler))
+        return sender
+
+    def test_delay_is_capped(self):
+        sender = FCMSender("http://fcm.test/send", "key", backoff=10, max_delay=5)
+        self.assertEqual(sender.get_delay(0, retry_after="3600"), 5)
+        self.assertEqual(sender.get_delay(3), 5)
+
+    def test_retries_stop_at_timeout(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return Response(503, headers={"Retry-After": "1"})
+
+        sender = self.create_sender(handler, max_retries=3, timeout=0.5)
+        report = asyncio.run(sender.send([("token", "title", "body")]))
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(report.failed, 1)
+
+    def test_retries_unavailable_tokens(self):
+        results = iter([[{"error": "Unavailable"}], [{"message_id": "1"}]])
+
+        def handler(request):
+            return Response(200, json={"results": next(results)})
+
+        sender = self.create_sender(handler, backoff=0)
+        report = asyncio.run(sender.send([("token", "title", "body")]))
+        self.assertEqual((report.sent, report.failed), (1, 0))
+
+
+class PushNotificationTaskTests(TestCase):
+    @mock.patch("apps.notifications.signals.send_push_notification_task")
+    def test_push_is_sent_after_commit(self, task):
+        notification = UserNotification.objects.create(
+            user=create_user(), title="Событие", body="Текст"
+        )
+        with self.captureOnCommitCallbacks() as callbacks:
+            send_push_notification(notification)
+        task.delay.assert_not_called()
+
+        (callback,) = callbacks
+        callback()
+        task.delay.assert_called_once_with(notification.pk)
@@ -0,0 +1,100 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils.timezone import localtime, timedelta
+
+from apps.api.models import Event
+from apps.api.tests.factories import create_event, create_user
+from apps.notifications.models import EventReminder, GroupNotification
+from apps.notifications.models.reminder import REMIND_HOURS, EventReminderQuerySet
+from apps.notifications.tasks import dispatch_due_reminders
+
+
+class EventReminderTests(TestCase):
+    def setUp(self):
+        self.event = create_event(create_user(), days=2)
+
+    def get_due(self, event=None):
+        event = event or self.event
+        return dict(
+            EventReminder.objects.pending()
+            .filter(event=event)
+            .values_list("remind_hours", "due_at")
+        )
+
+    def test_schedule_on_create(self):
+        start = self.event.start_datetime
+        self.assertEqual(
+            self.get_due(),
+            {hours: start - timedelta(hours=hours) for hours in REMIND_HOURS},
+        )
+
+    def test_schedule_skips_past_reminders(self):
+        event = Event.objects.get(pk=self.event.pk)
+        event.start_datetime = localtime() + timedelta(hours=2)
+        EventReminder.objects.schedule(event)
+        self.assertEqual(sorted(self.get_due()), [0, 1])
+
+    def test_reschedule_on_start_change(self):
+        pks = set(EventReminder.objects.values_list("pk", flat=True))
+        self.event.date += timedelta(days=1)
+        self.event.save()
+
+        start = self.event.start_datetime
+        self.assertEqual(
+            self.get_due(),
+            {hours: start - timedelta(hours=hours) for hours in REMIND_HOURS},
+        )
+        # строки сдвигаются, а не создаются заново
+        self.assertEqual(set(EventReminder.objects.values_list("pk", flat=True)), pks)
+
+    def test_unrelated_edit_keeps_reminders(self):
+        with mock.patch.object(EventReminderQuerySet, "schedule") as schedule:
+            self.event.title = "Новое название"
+            self.event.save()
+        schedule.assert_not_called()
+        self.assertEqual(len(self.get_due()), len(REMIND_HOURS))
+
+    def test_cancel_on_deactivate(self):
+        self.event.is_active = False
+        self.event.save()
+        self.assertEqual(self.get_due(), {})
+
+    def make_due(self, event: Event, start):
+        Event.objects.filter(pk=event.pk).update(start_datetime=start)
+        EventReminder.objects.filter(event=event).update(
+            due_at=localtime() - timedelta(minutes=1)
+        )
+
+    def test_dispatch(self):
+        self.make_due(self.event, localtime() + timedelta(hours=1))
+
+        self.assertEqual(
+            dispatch_due_reminders(), "Dispatched reminders: 4, skipped: 0"
+        )
+        self.assertEqual(
+            sorted(
+                GroupNotification.objects.filter(
+                    event=self.event, type=GroupNotification.Type.EVENT_REMIND
+                ).values_list("remind_hours", flat=True)
+            ),
+            sorted(REMIND_HOURS),
+        )
+        self.assertEqual(self.get_due(), {})
+
+    def test_dispatch_skips_started_events(self):
+        self.make_due(self.event, localtime() - timedelta(minutes=30))
+
+        self.assertEqual(
+            dispatch_due_reminders(), "Dispatched reminders: 1, skipped: 3"
+        )
+        self.assertEqual(
+            list(
+                GroupNotification.objects.filter(
+                    event=self.event, type=GroupNotification.Type.EVENT_REMIND
+                ).values_list("remind_hours", flat=True)
+            ),
+            [0],
+        )
+        # пропущенные напоминания тоже отмечаются отправленными
+        self.assertEqual(self.get_due(), {})
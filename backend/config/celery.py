@@ -12,5 +12,25 @@ celery_app.conf.beat_schedule = {
     "daily_event": {
         "task": "notifications.tasks.create_daily_event_notifications",
         "schedule": crontab("0", "12"),  # ежедневно в 12:00
-    }
+    },
+    "dispatch_due_reminders": {
+        "task": "apps.notifications.tasks.dispatch_due_reminders",
+        "schedule": crontab(),  # каждую минуту
+    },
+    "ensure_search_indices": {
+        "task": "apps.api.tasks.ensure_search_indices",
+        "schedule": crontab("*/10"),  # каждые 10 минут
+    },
+    "reconcile_participants_count": {
+        "task": "apps.api.tasks.reconcile_participants_count",
+        "schedule": crontab("30", "4"),  # ежедневно в 4:30
+    },
+    "reconcile_unread_counters": {
+        "task": "apps.chat.tasks.reconcile_unread_counters",
+        "schedule": crontab("15"),  # ежечасно
+    },
+    "reconcile_unread_notify_counters": {
+        "task": "apps.notifications.tasks.reconcile_unread_notify_counters",
+        "schedule": crontab("45"),  # ежечасно
+    },
 }
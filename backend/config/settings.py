@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import logging
 import os
 from pathlib import Path
 
@@ -82,6 +83,7 @@ INSTALLED_APPS = (
         "django.contrib.sessions",
         "django.contrib.messages",
         "django.contrib.staticfiles",
+        "django.contrib.postgres",
     ]
     + THIRD_PARTY_APPS
     + LOCAL_APPS
@@ -234,10 +236,75 @@ CELERY_BROKER_URL = (
 
 CELERY_TIMEZONE = "Europe/Moscow"
 
+# групповые уведомления доставляются пачками в параллельных задачах Celery
+NOTIFICATION_CHUNK_SIZE = int(os.environ.get("NOTIFICATION_CHUNK_SIZE", 500))
+NOTIFICATION_PUSH_CONCURRENCY = int(
+    os.environ.get("NOTIFICATION_PUSH_CONCURRENCY", 50)
+)
+# напоминания о событиях, забираемые за один проход dispatch_due_reminders
+REMINDER_BATCH_SIZE = int(os.environ.get("REMINDER_BATCH_SIZE", 100))
+
 ELASTICSEARCH_DSL = {
     "default": {"hosts": "http://elasticsearch:9200"},  # add to env later
 }
 
+# верхняя граница выдачи поиска для запросов без пагинации
+ELASTICSEARCH_MAX_RESULTS = int(os.environ.get("ELASTICSEARCH_MAX_RESULTS", 1000))
+
+# индексация выполняется в Celery, изменения схлопываются в пределах окна (с)
+ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = (
+    "apps.api.documents.queue.CoalescingSignalProcessor"
+)
+ELASTICSEARCH_DSL_QUEUE_WINDOW = int(
+    os.environ.get("ELASTICSEARCH_DSL_QUEUE_WINDOW", 2)
+)
+
+# движок ленты событий по умолчанию: "elasticsearch" или "database"
+EVENT_SEARCH_BACKEND = os.environ.get("EVENT_SEARCH_BACKEND", "elasticsearch")
+
+# время жизни кэша ленты событий (с) для анонимных и авторизованных запросов
+EVENT_FEED_CACHE_TIMEOUT = int(os.environ.get("EVENT_FEED_CACHE_TIMEOUT", 30))
+EVENT_FEED_CACHE_USER_TIMEOUT = int(
+    os.environ.get("EVENT_FEED_CACHE_USER_TIMEOUT", 10)
+)
+
+# трассировка чата пишется в файл из фонового потока (core.log_handlers);
+# уровни и доля сэмплирования задаются по типу события
+CHAT_TRACE_FILE = os.environ.get("CHAT_TRACE_FILE", "log.txt")
+CHAT_TRACE_LEVEL = os.environ.get("CHAT_TRACE_LEVEL", "INFO")
+CHAT_TRACE_LEVELS = {
+    "message_send": logging.INFO,
+    "message_deliver": logging.DEBUG,
+    "group_join": logging.INFO,
+    "group_leave": logging.INFO,
+    "user_groups": logging.DEBUG,
+}
+CHAT_TRACE_SAMPLE_RATES = {
+    "message_deliver": float(os.environ.get("CHAT_TRACE_DELIVER_SAMPLE_RATE", 0.01)),
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "chat_trace": {"format": "%(asctime)s %(levelname)s %(message)s"},
+    },
+    "handlers": {
+        "chat_trace": {
+            "class": "core.log_handlers.QueueFileHandler",
+            "filename": CHAT_TRACE_FILE,
+            "formatter": "chat_trace",
+        },
+    },
+    "loggers": {
+        "apps.chat.trace": {
+            "handlers": ["chat_trace"],
+            "level": CHAT_TRACE_LEVEL,
+            "propagate": False,
+        },
+    },
+}
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
@@ -257,6 +324,13 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 FILE_UPLOAD_MAX_MEMORY_SIZE = 104857600
 FCM_TOKEN = os.environ.get("FCM_TOKEN")
+# адрес можно заменить на фейковый сервер (manage.py push_benchmark)
+FCM_URL = os.environ.get("FCM_URL", "https://fcm.googleapis.com/fcm/send")
+FCM_MAX_RETRIES = int(os.environ.get("FCM_MAX_RETRIES", 3))
+# предел задержки между повторами (в том числе из Retry-After) и общего
+# времени отправки одной пачки пушей, секунды
+FCM_MAX_RETRY_DELAY = int(os.environ.get("FCM_MAX_RETRY_DELAY", 30))
+FCM_SEND_TIMEOUT = int(os.environ.get("FCM_SEND_TIMEOUT", 60))
 
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10240
 
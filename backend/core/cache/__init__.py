@@ -0,0 +1,7 @@
+# flake8: noqa: F401
+
+from .backends import get_or_compute
+from .invalidation import InvalidationRule, register_invalidation_rules
+from .keys import build_key, request_key_parts
+from .mixins import CachedListMixin
+from .namespaces import bump_namespace, bump_namespace_on_commit, get_namespace_version
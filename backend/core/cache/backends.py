@@ -0,0 +1,49 @@
+import time
+
+from django.core.cache import cache
+
+
+def wait_for_cache(key, timeout, interval=0.05):
+    """Ожидание значения, которое вычисляет другой процесс."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_compute(key, compute, timeout, stale_timeout=0, lock_timeout=10):
+    """
+    Значение из кэша или результат compute().
+
+    - пересчёт выполняет один процесс (блокировка в Redis), остальные
+      ждут его результата не дольше lock_timeout секунд;
+    - в течение stale_timeout после истечения timeout отдаётся
+      устаревшее значение, пока один процесс вычисляет новое.
+    """
+    lock_key = f"{key}_lock"
+    entry = cache.get(key)
+    if entry is not None:
+        expires_at, value = entry
+        if expires_at > time.time():
+            return value
+        locked = cache.add(lock_key, True, lock_timeout)
+        if not locked:
+            return value
+    else:
+        locked = cache.add(lock_key, True, lock_timeout)
+        if not locked:
+            entry = wait_for_cache(key, lock_timeout)
+            if entry is not None:
+                return entry[1]
+
+    try:
+        value = compute()
+        cache.set(key, (time.time() + timeout, value), timeout + stale_timeout)
+        return value
+    finally:
+        # блокировку снимает только тот, кто её взял
+        if locked:
+            cache.delete(lock_key)
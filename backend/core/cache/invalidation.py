@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+
+from django.db.models.signals import post_delete, post_save
+
+from .namespaces import bump_namespace_on_commit
+
+
+@dataclass(frozen=True)
+class InvalidationRule:
+    """Изменение любой из моделей сбрасывает пространство имён кэша."""
+
+    namespace: str
+    models: tuple
+
+
+def register_invalidation_rules(rules):
+    for rule in rules:
+
+        def invalidate(sender, namespace=rule.namespace, **kwargs):
+            bump_namespace_on_commit(namespace)
+
+        for model in rule.models:
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    invalidate,
+                    sender=model,
+                    weak=False,
+                    dispatch_uid=f"cache_{rule.namespace}_{model._meta.label}",
+                )
@@ -0,0 +1,26 @@
+import hashlib
+import json
+
+from .namespaces import get_namespace_version
+
+
+def build_key(namespace: str, *parts) -> str:
+    """Ключ значения: пространство имён, его версия и хеш частей ключа."""
+    content = json.dumps(parts, sort_keys=True, default=str)
+    digest = hashlib.md5(content.encode()).hexdigest()
+    return f"{namespace}_{get_namespace_version(namespace)}_{digest}"
+
+
+def request_key_parts(request, view_kwargs=None, user=False, host=False):
+    """Части ключа из запроса: параметры, аргументы URL, пользователь, хост."""
+    parts = {
+        "params": sorted(
+            (name, sorted(values)) for name, values in request.query_params.lists()
+        ),
+        "kwargs": view_kwargs or {},
+    }
+    if user:
+        parts["user"] = request.user.pk if request.user.is_authenticated else None
+    if host:
+        parts["host"] = request.get_host()
+    return parts
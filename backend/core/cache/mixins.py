@@ -0,0 +1,36 @@
+from rest_framework.response import Response
+
+from .backends import get_or_compute
+from .keys import build_key, request_key_parts
+
+
+class CachedListMixin:
+    """
+    Кэширование list() по параметрам запроса и аргументам URL
+    в пространстве имён cache_namespace.
+    """
+
+    cache_namespace = None
+    cache_timeout = 60 * 60
+    cache_stale_timeout = 60 * 60 * 24
+    cache_lock_timeout = 10
+
+    def is_cacheable(self):
+        return True
+
+    def get_cache_key(self, request):
+        return build_key(self.cache_namespace, request_key_parts(request, self.kwargs))
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_cacheable():
+            return super().list(request, *args, **kwargs)
+
+        list_response = super().list
+        data = get_or_compute(
+            self.get_cache_key(request),
+            lambda: list_response(request, *args, **kwargs).data,
+            timeout=self.cache_timeout,
+            stale_timeout=self.cache_stale_timeout,
+            lock_timeout=self.cache_lock_timeout,
+        )
+        return Response(data)
@@ -0,0 +1,31 @@
+from django.core.cache import cache
+from django.db import transaction
+
+
+def namespace_version_key(namespace: str) -> str:
+    return f"cache_namespace_{namespace}"
+
+
+def get_namespace_version(namespace: str) -> int:
+    """
+    Версия пространства имён входит во все его ключи, поэтому её
+    повышение за O(1) делает недоступными все значения группы.
+    """
+    key = namespace_version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_namespace(namespace: str):
+    key = namespace_version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def bump_namespace_on_commit(namespace: str):
+    transaction.on_commit(lambda: bump_namespace(namespace))
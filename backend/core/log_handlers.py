@@ -0,0 +1,67 @@
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class BlockingStopQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # при заполненной очереди остановка ждёт, пока поток её разберёт
+        self.queue.put(self._sentinel)
+
+
+class QueueFileHandler(QueueHandler):
+    """
+    Неблокирующая запись в файл: запись кладётся в очередь, а в файл
+    с ротацией её пишет фоновый поток QueueListener. Подходит для
+    асинхронного кода, где файловый ввод-вывод останавливает event loop.
+
+    Поток запускается при первой записи в каждом процессе: в воркерах,
+    созданных через fork (Celery prefork, gunicorn), потока родителя нет.
+    Очередь ограничена, при переполнении записи отбрасываются.
+    """
+
+    def __init__(
+        self,
+        filename,
+        max_bytes=10 * 1024 * 1024,
+        backup_count=5,
+        queue_size=10000,
+    ):
+        super().__init__(queue.Queue(queue_size))
+        self.queue_size = queue_size
+        self.target = RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, delay=True
+        )
+        self.listener = None
+        self.pid = None
+
+    def setFormatter(self, fmt):
+        # форматирование выполняется в потоке записи
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        return record
+
+    def start_listener(self):
+        if self.pid == os.getpid():
+            return
+        # записи, скопированные из очереди родителя, ему и принадлежат
+        self.queue = queue.Queue(self.queue_size)
+        self.listener = BlockingStopQueueListener(self.queue, self.target)
+        self.listener.start()
+        self.pid = os.getpid()
+
+    def enqueue(self, record):
+        # вызывается под блокировкой обработчика
+        self.start_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+    def close(self):
+        # вызывается logging.shutdown при завершении процесса
+        if self.pid == os.getpid() and self.listener._thread is not None:
+            self.listener.stop()
+        self.target.close()
+        super().close()
@@ -1,5 +1,14 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from elasticsearch_dsl import Search
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from collections import OrderedDict
 
@@ -75,3 +84,212 @@ class PageNumberSetPagination(PageNumberPagination):
                 "results": schema,
             },
         }
+
+
+class OptionalPageNumberPagination(PageNumberSetPagination):
+    """
+    Пагинация только при явном ?page_size=N, без параметра
+    выдаётся весь список (совместимо со старыми клиентами).
+    """
+
+    page_size = None
+
+
+class SearchAfterPagination(PageNumberSetPagination):
+    """
+    Пагинация поисковой выдачи Elasticsearch.
+
+    - ?page=N - постраничный режим с ключами PageNumberSetPagination;
+    - ?cursor=<token> (пустой для первой страницы) - курсорный режим
+      через search_after, стоимость не растёт с глубиной прокрутки;
+    - без параметров - вся выдача, но не более ELASTICSEARCH_MAX_RESULTS
+      (при page_query_required=False выдаётся первая страница).
+    """
+
+    cursor_query_param = "cursor"
+    tiebreaker = "id"
+    page_query_required = False
+    invalid_cursor_message = "Неверный курсор"
+
+    def is_cursor_mode(self, queryset, request):
+        return self.cursor_query_param in request.query_params and isinstance(
+            queryset, Search
+        )
+
+    def is_requested(self, queryset, request):
+        return self.page_query_param in request.query_params or self.is_cursor_mode(
+            queryset, request
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.next_cursor = None
+        self.cursor_mode = self.is_cursor_mode(queryset, request)
+        if self.cursor_mode:
+            return self.paginate_search_after(queryset, request)
+
+        if self.page_query_required and not self.is_requested(queryset, request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def paginate_search_after(self, search: Search, request):
+        page_size = self.get_page_size(request)
+        sort = search.to_dict().get("sort", [])
+        if not any(self._sort_field(item) == self.tiebreaker for item in sort):
+            sort = (sort or ["_score"]) + [self.tiebreaker]
+        search = search.sort(*sort)[:page_size]
+
+        cursor = request.query_params[self.cursor_query_param]
+        if cursor:
+            search = search.extra(search_after=self.decode_cursor(cursor))
+
+        hits = list(search.execute())
+        if len(hits) == page_size:
+            self.next_cursor = self.encode_cursor(list(hits[-1].meta.sort))
+        return hits
+
+    @staticmethod
+    def _sort_field(item):
+        return item if isinstance(item, str) else next(iter(item))
+
+    def encode_cursor(self, values):
+        return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(urlsafe_b64decode(cursor.encode()))
+        except (BinasciiError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_cursor_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_cursor_link()),
+                    ("next_cursor", self.next_cursor),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class KeysetPagination(PageNumberSetPagination):
+    """
+    Пагинация ленты по ключу (ordering_field, id) от новых к старым.
+
+    - ?before=<id> (пустой для первой страницы) - записи старше указанной;
+    - ?after=<id> - записи новее указанной;
+    - ?page=N или без параметров - постраничный режим PageNumberSetPagination.
+
+    В режиме ключа нет COUNT(*) и OFFSET, стоимость не зависит от глубины.
+    """
+
+    before_query_param = "before"
+    after_query_param = "after"
+    ordering_field = "sent_at"
+    invalid_key_message = "Неверный ключ страницы"
+
+    def is_keyset_mode(self, request):
+        return (
+            self.before_query_param in request.query_params
+            or self.after_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keyset_mode = self.is_keyset_mode(request)
+        if not self.keyset_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        field = self.ordering_field
+        after = request.query_params.get(self.after_query_param)
+        before = request.query_params.get(self.before_query_param)
+
+        if after:
+            value, pk = self.get_anchor(queryset, after)
+            queryset = queryset.filter(
+                Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk})
+            ).order_by(field, "pk")
+        else:
+            if before:
+                value, pk = self.get_anchor(queryset, before)
+                queryset = queryset.filter(
+                    Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk})
+                )
+            queryset = queryset.order_by(f"-{field}", "-pk")
+
+        rows = list(queryset[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if after:
+            rows.reverse()
+            has_older, has_newer = True, has_more
+        else:
+            has_older, has_newer = has_more, bool(before)
+
+        self.before = rows[-1].pk if rows and has_older else None
+        self.after = rows[0].pk if rows and has_newer else None
+        return rows
+
+    def get_anchor(self, queryset, value):
+        try:
+            anchor = (
+                queryset.filter(pk=int(value))
+                .values_list(self.ordering_field, "pk")
+                .first()
+            )
+        except ValueError:
+            anchor = None
+        if anchor is None:
+            raise NotFound(self.invalid_key_message)
+        return anchor
+
+    def get_keyset_link(self, param, value):
+        if value is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        for key in (self.before_query_param, self.after_query_param):
+            url = remove_query_param(url, key)
+        return replace_query_param(url, param, value)
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+
+        return Response(
+            OrderedDict(
+                [
+                    (
+                        "next",
+                        self.get_keyset_link(self.before_query_param, self.before),
+                    ),
+                    (
+                        "previous",
+                        self.get_keyset_link(self.after_query_param, self.after),
+                    ),
+                    ("before", self.before),
+                    ("after", self.after),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+def limit_results(queryset: Search | QuerySet) -> Search | QuerySet:
+    """Ограничение выдачи без пагинации вместо запроса всех совпадений."""
+    return queryset[: settings.ELASTICSEARCH_MAX_RESULTS]
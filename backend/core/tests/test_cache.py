@@ -0,0 +1,32 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.cache.backends import get_or_compute
+
+
+class GetOrComputeTests(SimpleTestCase):
+    key = "test_get_or_compute"
+    lock_key = f"{key}_lock"
+
+    def setUp(self):
+        cache.delete_many([self.key, self.lock_key])
+        self.addCleanup(cache.delete_many, [self.key, self.lock_key])
+
+    def test_compute_and_cache(self):
+        self.assertEqual(get_or_compute(self.key, lambda: 1, timeout=60), 1)
+        self.assertEqual(get_or_compute(self.key, lambda: 2, timeout=60), 1)
+        self.assertIsNone(cache.get(self.lock_key))
+
+    def test_keeps_lock_of_other_process(self):
+        cache.add(self.lock_key, "other", 60)
+        value = get_or_compute(self.key, lambda: 1, timeout=60, lock_timeout=0.1)
+        self.assertEqual(value, 1)
+        self.assertEqual(cache.get(self.lock_key), "other")
+
+    def test_stale_value_while_locked(self):
+        get_or_compute(self.key, lambda: 1, timeout=0, stale_timeout=60)
+        cache.add(self.lock_key, "other", 60)
+        self.assertEqual(
+            get_or_compute(self.key, lambda: 2, timeout=60, stale_timeout=60), 1
+        )
+        self.assertEqual(cache.get(self.lock_key), "other")
@@ -14,6 +14,6 @@ done
 
 
 python manage.py collectstatic --noinput
-# python manage.py search_index --rebuild -f
+# python manage.py bulk_index --rebuild
 
 uvicorn config.asgi:application --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file